@@ -0,0 +1,70 @@
+"""Helpers for serving pre-encoded JSON with ETag revalidation"""
+
+import hashlib
+from typing import Dict, Optional
+
+from fastapi import Request, Response
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Clients may reuse a response briefly, then must revalidate with the ETag
+DEFAULT_CACHE_CONTROL = "public, max-age=60, must-revalidate"
+
+# For URLs whose content never changes (versioned tiles, hashed assets)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def encoded_etag(etag: str, coding: str) -> str:
+    """ETag for a content-coded variant; RFC 9110 requires it to differ from the identity ETag"""
+    return etag[:-1] + f'-{coding}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+# Conditional request outcomes: 304s served vs full bodies sent
+_revalidations = {"hits": 0, "misses": 0}
+
+
+def cache_stats() -> Dict[str, int]:
+    """ETag revalidation counters (hits are 304 responses)"""
+    return dict(_revalidations)
+
+
+def cached_response(
+    request: Request,
+    body: bytes,
+    etag: str,
+    media_type: str = JSON_MEDIA_TYPE,
+    cache_control: str = DEFAULT_CACHE_CONTROL,
+) -> Response:
+    """
+    Return the pre-encoded body, or an empty 304 if the client already has it.
+
+    API responses may be gzipped on the way out under encoded_etag(etag,
+    "gzip"), so that form of the ETag is accepted too.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or etag_matches(if_none_match, encoded_etag(etag, "gzip")):
+        _revalidations["hits"] += 1
+        return Response(status_code=304, headers=headers)
+    _revalidations["misses"] += 1
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -1,52 +1,20 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
 from typing import List
-from app.models.density import DevelopmentPattern, DensityCalculation, DensityResult
+from app.models.density import (
+    DevelopmentPattern,
+    DensityCalculation,
+    DensityResult,
+    DensitySweep,
+    DensitySweepResult,
+)
+from app.metrics import timed
+from app.services import density as density_service
+from app.services.density import DEVELOPMENT_PATTERNS
 
 router = APIRouter()
 
-# Predefined development patterns
-DEVELOPMENT_PATTERNS = [
-    DevelopmentPattern(
-        id="single-family-sprawl",
-        name="Single-Family Suburban Sprawl",
-        units_per_acre=2.5,
-        avg_unit_size_sqft=2200,
-        description="Typical low-density suburban development with large lots",
-        parking_spaces_per_unit=2.5,
-        road_width_feet=32,
-        typical_lot_coverage=0.25
-    ),
-    DevelopmentPattern(
-        id="townhomes",
-        name="Townhomes",
-        units_per_acre=8,
-        avg_unit_size_sqft=1600,
-        description="Medium-density attached housing",
-        parking_spaces_per_unit=2.0,
-        road_width_feet=28,
-        typical_lot_coverage=0.45
-    ),
-    DevelopmentPattern(
-        id="mixed-use-mid-rise",
-        name="Mixed-Use Mid-Rise",
-        units_per_acre=45,
-        avg_unit_size_sqft=950,
-        description="4-6 story buildings with retail on ground floor",
-        parking_spaces_per_unit=1.2,
-        road_width_feet=24,
-        typical_lot_coverage=0.65
-    ),
-    DevelopmentPattern(
-        id="high-rise",
-        name="High-Rise Urban",
-        units_per_acre=120,
-        avg_unit_size_sqft=850,
-        description="8+ story buildings in urban core",
-        parking_spaces_per_unit=0.8,
-        road_width_feet=24,
-        typical_lot_coverage=0.70
-    ),
-]
+# Upper bound on populations x people_per_unit x patterns for a single sweep
+MAX_SWEEP_POINTS = 250_000
 
 
 @router.get("/patterns", response_model=List[DevelopmentPattern])
@@ -58,44 +26,49 @@ async def get_development_patterns():
 @router.post("/calculate", response_model=DensityResult)
 async def calculate_density(calculation: DensityCalculation):
     """Calculate land use and emissions for given population and density"""
-    pattern = calculation.pattern
-
-    # Calculate units needed
-    total_units = int(calculation.population / calculation.people_per_unit)
-
-    # Calculate residential acres
-    residential_acres = total_units / pattern.units_per_acre
-
-    # Estimate infrastructure (simplified - roads, parking, utilities)
-    # This is a rough approximation
-    parking_acres = (total_units * pattern.parking_spaces_per_unit * 300) / 43560  # 300 sq ft per space
-    road_multiplier = 1.3 if pattern.units_per_acre < 5 else 1.15 if pattern.units_per_acre < 20 else 1.08
-    infrastructure_acres = residential_acres * (road_multiplier - 1) + parking_acres
+    return density_service.calculate_cached(
+        calculation.pattern, calculation.population, calculation.people_per_unit
+    )
 
-    total_acres = residential_acres + infrastructure_acres
 
-    # Football field comparison (1 field = 1.32 acres including end zones)
-    football_fields = total_acres / 1.32
+@router.post("/sweep", response_model=DensitySweepResult)
+async def sweep_density(sweep: DensitySweep):
+    """Calculate land use and emissions over a grid of populations, ratios and patterns"""
+    population_range = range(0)
+    if sweep.population_range:
+        rng = sweep.population_range
+        if rng.step <= 0:
+            raise HTTPException(status_code=400, detail="population_range.step must be positive")
+        population_range = range(rng.start, rng.stop, rng.step)
+    population_count = len(sweep.populations or []) + len(population_range)
+    if not population_count:
+        raise HTTPException(status_code=400, detail="Provide populations or population_range")
 
-    # Estimate vehicle miles and CO2 (very simplified)
-    # Lower density = more driving
-    avg_vmt_per_household_per_year = 25000 if pattern.units_per_acre < 5 else \
-                                      18000 if pattern.units_per_acre < 20 else \
-                                      10000 if pattern.units_per_acre < 50 else \
-                                      6000
+    if not sweep.people_per_unit or any(ratio <= 0 for ratio in sweep.people_per_unit):
+        raise HTTPException(status_code=400, detail="people_per_unit values must be positive")
+    # Reject oversized sweeps before building anything proportional to their size
+    if population_count * len(sweep.people_per_unit) > MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep of more than {MAX_SWEEP_POINTS} points exceeds the limit",
+        )
 
-    total_vmt = total_units * avg_vmt_per_household_per_year
+    patterns = list(sweep.patterns or [])
+    if sweep.pattern_ids is not None:
+        unknown = [pid for pid in sweep.pattern_ids if pid not in density_service.PATTERNS_BY_ID]
+        if unknown:
+            raise HTTPException(status_code=404, detail=f"Unknown pattern ids: {', '.join(unknown)}")
+        patterns.extend(density_service.PATTERNS_BY_ID[pid] for pid in sweep.pattern_ids)
+    elif not patterns:
+        patterns = list(DEVELOPMENT_PATTERNS)
 
-    # CO2 emissions (roughly 0.89 lbs CO2 per mile, convert to tons)
-    co2_tons = (total_vmt * 0.89) / 2000
+    points = population_count * len(sweep.people_per_unit) * len(patterns)
+    if points > MAX_SWEEP_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Sweep of {points} points exceeds the limit of {MAX_SWEEP_POINTS}",
+        )
+    populations = list(sweep.populations or []) + list(population_range)
 
-    return DensityResult(
-        total_units_needed=total_units,
-        residential_acres=round(residential_acres, 2),
-        infrastructure_acres=round(infrastructure_acres, 2),
-        total_acres=round(total_acres, 2),
-        comparison_football_fields=round(football_fields, 1),
-        estimated_co2_tons_per_year=round(co2_tons, 0),
-        vehicle_miles_per_year=total_vmt,
-        pattern_used=pattern
-    )
+    with timed("compute"):
+        return density_service.sweep(patterns, populations, sweep.people_per_unit)
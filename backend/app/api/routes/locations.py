@@ -1,60 +1,267 @@
-from fastapi import APIRouter, HTTPException
-from typing import List
-from pathlib import Path
-import json
-from app.models.location import Location, LocationDetail
+import zlib
+from datetime import date as Date
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import List, Optional, Union
+from app.api.caching import IMMUTABLE_CACHE_CONTROL, cached_response, make_etag
+from app.api.static_files import accepted_encodings
+from app.models.location import (
+    Location,
+    LocationDetail,
+    LocationDetailCompact,
+    LocationMapView,
+    LocationPage,
+    TimePoint,
+)
+from app.services import change_masks
+from app.services.change_masks import change_store
+from app.models.bundle import LocationBundle
+from app.services.location_bundle import SECTIONS, bundle_builder
+from app.services.location_listing import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, SORT_KEYS, Cursor
+from app.services.location_store import location_store
+from app.services.spatial_index import MAX_ZOOM, BoundingBox
+from app.services.tile_pyramid import tile_store
 
 router = APIRouter()
 
-# Load location data from JSON files
-DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "locations"
 
+WORLD_BBOX = BoundingBox(-180.0, -90.0, 180.0, 90.0)
 
-def load_locations() -> List[dict]:
-    """Load all location data from JSON files"""
-    locations = []
-    if not DATA_DIR.exists():
-        return locations
 
-    for json_file in DATA_DIR.glob("*.json"):
-        try:
-            with open(json_file, "r") as f:
-                location_data = json.load(f)
-                locations.append(location_data)
-        except Exception as e:
-            print(f"Error loading {json_file}: {e}")
+@router.get("/", response_model=Union[List[Location], LocationMapView, LocationPage])
+async def get_locations(
+    request: Request,
+    bbox: Optional[str] = None,
+    zoom: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    sort: Optional[str] = None,
+    county: Optional[str] = None,
+    ecosystem_type: Optional[str] = None,
+):
+    """
+    Get all locations with basic information.
 
-    return locations
+    With bbox=minLon,minLat,maxLon,maxLat and/or zoom, returns only the
+    locations in view as a LocationMapView, merging nearby ones into
+    clusters at low zoom levels.
 
+    With any of limit, cursor, fields, sort, county or ecosystem_type, returns
+    a LocationPage instead: sort is one of id, name, county, ecosystem_type
+    (prefix "-" for descending), county and ecosystem_type filter by exact,
+    case-insensitive match, fields is a comma-separated projection, and
+    next_cursor is passed back as cursor to fetch the following page.
+    """
+    paging = (limit, cursor, fields, sort, county, ecosystem_type)
+    if any(param is not None for param in paging):
+        if bbox is not None or zoom is not None:
+            raise HTTPException(status_code=400, detail="bbox/zoom cannot be combined with paging parameters")
+        return get_location_page(request, limit, cursor, fields, sort, county, ecosystem_type)
 
-def load_location_by_id(location_id: str) -> dict:
-    """Load a specific location by ID"""
-    location_file = DATA_DIR / f"{location_id}.json"
-    if not location_file.exists():
-        return None
+    if bbox is None and zoom is None:
+        body, etag = location_store.list_json()
+        return cached_response(request, body, etag)
 
     try:
-        with open(location_file, "r") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading {location_file}: {e}")
-        return None
+        box = BoundingBox.parse(bbox) if bbox is not None else WORLD_BBOX
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid bbox: {e}")
+    if zoom is not None and not 0 <= zoom <= MAX_ZOOM:
+        raise HTTPException(status_code=400, detail=f"zoom must be between 0 and {MAX_ZOOM}")
 
+    body, etag = location_store.map_view_json(box, zoom if zoom is not None else MAX_ZOOM)
+    return cached_response(request, body, etag)
 
-@router.get("/", response_model=List[Location])
-async def get_locations():
-    """Get all locations with basic information"""
-    locations_data = load_locations()
-    # Convert to Location model (basic info only)
-    return [Location(**loc) for loc in locations_data]
 
+def get_location_page(
+    request: Request,
+    limit: Optional[int],
+    cursor: Optional[str],
+    fields: Optional[str],
+    sort: Optional[str],
+    county: Optional[str],
+    ecosystem_type: Optional[str],
+):
+    """Validate the paging parameters and return one LocationPage"""
+    if limit is None:
+        limit = DEFAULT_PAGE_SIZE
+    if not 1 <= limit <= MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_SIZE}")
 
-@router.get("/{location_id}", response_model=LocationDetail)
-async def get_location_detail(location_id: str):
-    """Get detailed information for a specific location"""
-    location_data = load_location_by_id(location_id)
+    sort = sort or "id"
+    descending = sort.startswith("-")
+    sort = sort.lstrip("-")
+    if sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(SORT_KEYS)}")
 
-    if not location_data:
+    projection = None
+    if fields is not None:
+        projection = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = projection - set(Location.model_fields)
+        if unknown or not projection:
+            raise HTTPException(
+                status_code=400,
+                detail=f"fields must be a comma-separated subset of: {', '.join(Location.model_fields)}",
+            )
+
+    filters = {}
+    if county is not None:
+        filters["county"] = county
+    if ecosystem_type is not None:
+        filters["ecosystem_type"] = ecosystem_type
+
+    try:
+        position = Cursor.decode(cursor) if cursor is not None else None
+        body, etag = location_store.page_json(sort, descending, filters, position, limit, projection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+    return cached_response(request, body, etag)
+
+
+@router.get("/{location_id}", response_model=Union[LocationDetail, LocationDetailCompact])
+async def get_location_detail(location_id: str, request: Request, timeline: str = "full"):
+    """
+    Get detailed information for a specific location.
+
+    With timeline=compact, time points are replaced by a list of their dates;
+    fetch the ones needed from /{location_id}/time_points.
+    """
+    if timeline not in ("full", "compact"):
+        raise HTTPException(status_code=400, detail="timeline must be 'full' or 'compact'")
+
+    entry = location_store.get_entry(location_id)
+
+    if not entry:
+        raise HTTPException(status_code=404, detail=f"Location {location_id} not found")
+
+    if timeline == "compact":
+        return cached_response(request, *entry.compact_json)
+    return cached_response(request, entry.detail_json, entry.detail_etag)
+
+
+@router.get("/{location_id}/time_points", response_model=List[TimePoint])
+async def get_location_time_points(
+    location_id: str,
+    request: Request,
+    start: Optional[str] = Query(None, alias="from"),
+    end: Optional[str] = Query(None, alias="to"),
+):
+    """Get the full time points dated between from and to (inclusive, YYYY-MM-DD; either may be omitted)"""
+    for value in (start, end):
+        if value is not None:
+            try:
+                Date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid date '{value}', expected YYYY-MM-DD")
+
+    entry = location_store.get_entry(location_id)
+
+    if not entry:
         raise HTTPException(status_code=404, detail=f"Location {location_id} not found")
 
-    return LocationDetail(**location_data)
+    body = entry.time_points_json(start, end)
+    return cached_response(request, body, make_etag(body))
+
+
+@router.get("/{location_id}/bundle", response_model=LocationBundle)
+async def get_location_bundle(
+    location_id: str,
+    request: Request,
+    sections: Optional[str] = None,
+    timeline: str = "full",
+):
+    """
+    Get a location page's data in one response: the detail, the affected
+    species and density metadata.
+
+    sections is a comma-separated subset of location, species and density
+    (default: all); timeline=compact applies to the location section as on
+    the detail endpoint.
+    """
+    if timeline not in ("full", "compact"):
+        raise HTTPException(status_code=400, detail="timeline must be 'full' or 'compact'")
+
+    if sections is None:
+        wanted = frozenset(SECTIONS)
+    else:
+        wanted = frozenset(name.strip() for name in sections.split(",") if name.strip())
+        if not wanted or not wanted <= set(SECTIONS):
+            raise HTTPException(
+                status_code=400, detail=f"sections must be a comma-separated subset of: {', '.join(SECTIONS)}"
+            )
+
+    bundle = bundle_builder.bundle_json(location_id, wanted, timeline == "compact")
+    if bundle is None:
+        raise HTTPException(status_code=404, detail=f"Location {location_id} not found")
+
+    return cached_response(request, *bundle)
+
+
+def require_timeline_dates(location_id: str, *dates: str) -> None:
+    """404 unless every date belongs to the location's timeline, so only known files are read"""
+    entry = location_store.get_entry(location_id)
+    known = {tp.date for tp in entry.detail.time_points} if entry else set()
+    for date in dates:
+        if date not in known:
+            raise HTTPException(status_code=404, detail=f"No timeline frame {date} for location {location_id}")
+
+
+@router.get("/{location_id}/tiles/{date}/{z}/{x}/{y}")
+async def get_location_tile(location_id: str, date: str, z: int, x: int, y: int, request: Request):
+    """Get one deep-zoom tile of a timeline frame"""
+    require_timeline_dates(location_id, date)
+
+    pyramid = tile_store.get(location_id, date)
+    tile = pyramid.tile(z, x, y) if pyramid else None
+    if tile is None:
+        raise HTTPException(status_code=404, detail=f"Tile {z}/{x}/{y} not found")
+
+    # Tile URLs carry the pyramid version, so a tile at a given URL never changes
+    return cached_response(
+        request, tile, make_etag(tile),
+        media_type=pyramid.media_type,
+        cache_control=IMMUTABLE_CACHE_CONTROL,
+    )
+
+
+@router.get("/{location_id}/changes/{from_date}/{to_date}/heatmap")
+async def get_change_heatmap(location_id: str, from_date: str, to_date: str, request: Request):
+    """Get the precomputed change heatmap (RGBA PNG) between two timeline dates"""
+    require_timeline_dates(location_id, from_date, to_date)
+    found = change_store.get(location_id, from_date, to_date, "heatmap")
+    if not found:
+        raise HTTPException(status_code=404, detail=f"No change data for {from_date} to {to_date}")
+
+    data, key = found
+    return cached_response(request, data, f'"{key}-heatmap"', media_type="image/png")
+
+
+@router.get("/{location_id}/changes/{from_date}/{to_date}/mask")
+async def get_change_mask(location_id: str, from_date: str, to_date: str, request: Request):
+    """
+    Get the precomputed change mask between two timeline dates.
+
+    The body is the row-major np.packbits() bitmap (most significant bit
+    first); X-Mask-Width and X-Mask-Height give its size. Clients that accept
+    deflate get the stored compressed bits as-is.
+    """
+    require_timeline_dates(location_id, from_date, to_date)
+    found = change_store.get(location_id, from_date, to_date, "mask")
+    if not found:
+        raise HTTPException(status_code=404, detail=f"No change data for {from_date} to {to_date}")
+
+    data, key = found
+    width, height = change_masks.decode_mask_header(data)
+    compressed = data[change_masks.HEADER.size:]
+    if "deflate" in accepted_encodings(request.headers.get("accept-encoding", "")):
+        body, etag, encoding = compressed, f'"{key}-mask-deflate"', "deflate"
+    else:
+        body, etag, encoding = zlib.decompress(compressed), f'"{key}-mask"', None
+
+    response = cached_response(request, body, etag, media_type="application/octet-stream")
+    response.headers["X-Mask-Width"] = str(width)
+    response.headers["X-Mask-Height"] = str(height)
+    response.headers["Vary"] = "Accept-Encoding"
+    if encoding and response.status_code == 200:
+        response.headers["Content-Encoding"] = encoding
+    return response
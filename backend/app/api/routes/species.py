@@ -1,34 +1,35 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import List
+from app.api.caching import cached_response
 from app.models.species import Species, SpeciesImpact
+from app.services.species_store import species_store
 
 router = APIRouter()
 
-# Placeholder data
-SPECIES_DATA = []
-
 
 @router.get("/", response_model=List[Species])
-async def get_species():
+async def get_species(request: Request):
     """Get all species information"""
-    # TODO: Load from database or JSON file
-    return SPECIES_DATA
+    return cached_response(request, *species_store.list_json())
 
 
 @router.get("/{species_id}", response_model=Species)
-async def get_species_detail(species_id: str):
+async def get_species_detail(species_id: str, request: Request):
     """Get detailed information for a specific species"""
-    # TODO: Load from database or JSON file
-    species = next((s for s in SPECIES_DATA if s.get("id") == species_id), None)
+    species = species_store.species_json(species_id)
 
     if not species:
         raise HTTPException(status_code=404, detail=f"Species {species_id} not found")
 
-    return species
+    return cached_response(request, *species)
 
 
 @router.get("/location/{location_id}", response_model=List[Species])
-async def get_species_by_location(location_id: str):
+async def get_species_by_location(location_id: str, request: Request):
     """Get all species affected at a specific location"""
-    # TODO: Implement filtering logic
-    return []
+    species = species_store.location_species_json(location_id)
+
+    if species is None:
+        raise HTTPException(status_code=404, detail=f"Location {location_id} not found")
+
+    return cached_response(request, *species)
@@ -0,0 +1,73 @@
+"""The SPA's index.html, held in memory with its ETag and gzip variant"""
+
+import gzip
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+
+from app.api.caching import cached_response, encoded_etag, make_etag
+from app.api.static_files import accepted_encodings
+from app.services.files import file_signature
+
+HTML_MEDIA_TYPE = "text/html; charset=utf-8"
+
+# Browsers must revalidate the shell on every navigation; a match costs a 304
+SHELL_CACHE_CONTROL = "no-cache"
+
+# How often (seconds) the file is checked for changes
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+class SpaShell:
+    """Serves one HTML file from memory, re-reading it only when its signature changes"""
+
+    def __init__(self, path: Path, check_interval: float = DEFAULT_CHECK_INTERVAL):
+        self.path = path
+        self.check_interval = check_interval
+        self._signature = None
+        # (body, etag, gzip body, gzip etag), or None if the file does not exist
+        self._cached: Optional[Tuple[bytes, str, bytes, str]] = None
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def _load(self) -> Optional[Tuple[bytes, str, bytes, str]]:
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return self._cached
+        with self._lock:
+            if now - self._last_check < self.check_interval:
+                return self._cached
+            signature = file_signature(self.path)
+            if signature != self._signature:
+                cached = None
+                if signature is not None:
+                    try:
+                        body = self.path.read_bytes()
+                    except OSError as e:
+                        print(f"Error loading {self.path}: {e}")
+                        body = None
+                    if body is not None:
+                        etag = make_etag(body)
+                        cached = (body, etag, gzip.compress(body, compresslevel=9, mtime=0), encoded_etag(etag, "gzip"))
+                self._cached = cached
+                self._signature = signature
+            self._last_check = now
+            return self._cached
+
+    def response(self, request: Request) -> Optional[Response]:
+        """The shell (gzipped if accepted) or a 304; None if the file does not exist"""
+        cached = self._load()
+        if cached is None:
+            return None
+        body, etag, gzip_body, gzip_etag = cached
+        if "gzip" in accepted_encodings(request.headers.get("accept-encoding", "")):
+            response = cached_response(request, gzip_body, gzip_etag, HTML_MEDIA_TYPE, SHELL_CACHE_CONTROL)
+            if response.status_code == 200:
+                response.headers["Content-Encoding"] = "gzip"
+        else:
+            response = cached_response(request, body, etag, HTML_MEDIA_TYPE, SHELL_CACHE_CONTROL)
+        response.headers["Vary"] = "Accept-Encoding"
+        return response
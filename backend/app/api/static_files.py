@@ -0,0 +1,317 @@
+"""
+Static file serving with build-time precompressed variants, byte ranges and
+per-path caching, plus gzip for dynamic API responses.
+
+scripts/precompress_assets.py writes .br and .gz siblings next to
+compressible files; PrecompressedStaticFiles serves the best one the client
+accepts, so static assets cost no compression work at request time. Only
+/api responses are compressed on the fly.
+"""
+
+import gzip
+import mimetypes
+import os
+import zlib
+from typing import Dict, Optional, Sequence, Tuple
+
+import anyio
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.caching import encoded_etag, etag_matches
+
+# Preferred first when the client accepts several
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# API responses smaller than this are not worth compressing
+API_GZIP_MINIMUM_SIZE = 1024
+API_GZIP_LEVEL = 6
+
+# zlib window bits selecting the gzip container
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+COMPRESSIBLE_MEDIA_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+
+
+def accepted_encodings(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q}, dropping q=0 entries"""
+    accepted = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if coding and q > 0:
+            accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range Range header into inclusive (start, end) offsets.
+
+    Returns None when the header should be ignored (malformed, not bytes, or
+    several ranges, which are answered with the whole file); raises
+    UnsatisfiableRange when the range lies beyond the end of the file.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if first:
+            start = int(first)
+            end = int(last) if last else size - 1
+            if start >= size:
+                raise UnsatisfiableRange()
+            if start > end:
+                return None
+        else:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix == 0:
+                raise UnsatisfiableRange()
+            start, end = max(0, size - suffix), size - 1
+    except ValueError:
+        return None
+    if start < 0:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange()
+    return start, min(end, size - 1)
+
+
+class FileRangeResponse(FileResponse):
+    """206 response streaming one byte range of a file"""
+
+    def __init__(self, path, byte_range: Tuple[int, int], stat_result: os.stat_result, headers: Dict[str, str]):
+        start, end = byte_range
+        self.byte_range = byte_range
+        headers = {
+            **headers,
+            "Content-Range": f"bytes {start}-{end}/{stat_result.st_size}",
+            "Content-Length": str(end - start + 1),
+        }
+        super().__init__(path, status_code=206, headers=headers, stat_result=stat_result)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        if scope["method"].upper() == "HEAD":
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+            return
+        start, end = self.byte_range
+        remaining = end - start + 1
+        async with await anyio.open_file(self.path, mode="rb") as file:
+            await file.seek(start)
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+        if remaining > 0:
+            # The file shrank under us; end the body rather than hang the client
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that prefers a fresh .br or .gz sibling when Accept-Encoding
+    allows it, answers single byte-range requests on uncompressed files, and
+    sets Cache-Control from `cache_rules`: (path prefix, value) pairs matched
+    against the path inside the mount, first match wins.
+    """
+
+    def __init__(self, *args, cache_rules: Sequence[Tuple[str, str]] = (), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_rules = list(cache_rules)
+
+    def cache_control(self, scope: Scope) -> Optional[str]:
+        path = self.get_path(scope).replace(os.sep, "/")
+        for prefix, value in self.cache_rules:
+            if path.startswith(prefix):
+                return value
+        return None
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = self._file_response(full_path, stat_result, scope, status_code)
+        cache_control = self.cache_control(scope)
+        if cache_control is not None:
+            response.headers["Cache-Control"] = cache_control
+        return response
+
+    def _file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int) -> Response:
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+
+        for encoding, suffix in sorted(PRECOMPRESSED_ENCODINGS, key=lambda e: -accepted.get(e[0], 0)):
+            if encoding not in accepted:
+                continue
+            variant_path = f"{full_path}{suffix}"
+            try:
+                variant_stat = os.stat(variant_path)
+            except OSError:
+                continue
+            # A variant older than its source is stale; ignore it until it is rebuilt
+            if variant_stat.st_mtime < stat_result.st_mtime:
+                continue
+            # The ETag comes from the variant's own stat, so each encoding revalidates separately
+            response = FileResponse(
+                variant_path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                media_type=mimetypes.guess_type(str(full_path))[0] or "text/plain",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Vary"] = "Accept-Encoding"
+        if response.status_code != 200:
+            return response
+        response.headers["Accept-Ranges"] = "bytes"
+
+        range_header = request_headers.get("range")
+        if range_header is None or not self._if_range_matches(request_headers, response.headers):
+            return response
+        try:
+            byte_range = parse_range(range_header, stat_result.st_size)
+        except UnsatisfiableRange:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{stat_result.st_size}"})
+        if byte_range is None:
+            return response
+        return FileRangeResponse(full_path, byte_range, stat_result, {
+            "Accept-Ranges": "bytes",
+            "Vary": "Accept-Encoding",
+            "ETag": response.headers["etag"],
+            "Last-Modified": response.headers["last-modified"],
+        })
+
+    @staticmethod
+    def _if_range_matches(request_headers: Headers, response_headers) -> bool:
+        """A Range applies unless If-Range names a different version of the file"""
+        if_range = request_headers.get("if-range")
+        if if_range is None:
+            return True
+        if if_range.startswith(('"', 'W/"')):
+            # Weak validators never match If-Range
+            return not if_range.startswith("W/") and etag_matches(if_range, response_headers["etag"])
+        return if_range == response_headers["last-modified"]
+
+
+class ApiGZipResponder:
+    """
+    Gzip one response when it is compressible and large enough.
+
+    Responses that set their own Content-Encoding, media types that are
+    already compressed (images, masks) and bodies under minimum_size pass
+    through untouched. A compressed response gets its own ETag,
+    encoded_etag(etag, "gzip"); a 304 carries that form when it is the one
+    the client sent.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.send: Optional[Send] = None
+        self.if_none_match: Optional[str] = None
+        self.start: Optional[Message] = None
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        self.if_none_match = Headers(scope=scope).get("if-none-match")
+        await self.app(scope, receive, self.send_with_gzip)
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # Held back until the first body message shows whether to compress
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.start is not None:
+            start, self.start = self.start, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            self.passthrough = (
+                "content-encoding" in headers
+                or not headers.get("content-type", "").startswith(COMPRESSIBLE_MEDIA_TYPES)
+                or (len(body) < self.minimum_size and not more_body)
+            )
+            etag = headers.get("etag")
+            if self.passthrough:
+                if etag is not None and start["status"] == 304 and "content-encoding" not in headers \
+                        and etag_matches(self.if_none_match, encoded_etag(etag, "gzip")):
+                    headers["ETag"] = encoded_etag(etag, "gzip")
+                await self.send({**start, "headers": headers.raw})
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            if etag is not None:
+                headers["ETag"] = encoded_etag(etag, "gzip")
+            if more_body:
+                del headers["Content-Length"]
+                self.compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, GZIP_WBITS)
+                message = {**message, "body": self.compressor.compress(body)}
+            else:
+                body = gzip.compress(body, compresslevel=self.compresslevel, mtime=0)
+                headers["Content-Length"] = str(len(body))
+                message = {**message, "body": body}
+            await self.send({**start, "headers": headers.raw})
+            await self.send(message)
+            return
+
+        if self.passthrough or self.compressor is None:
+            await self.send(message)
+            return
+        body = self.compressor.compress(message.get("body", b""))
+        if not message.get("more_body", False):
+            body += self.compressor.flush()
+        await self.send({**message, "body": body})
+
+
+class ApiGZipMiddleware:
+    """Gzip responses under a path prefix when they are compressible and large enough"""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        prefix: str = "/api/",
+        minimum_size: int = API_GZIP_MINIMUM_SIZE,
+        compresslevel: int = API_GZIP_LEVEL,
+    ) -> None:
+        self.app = app
+        self.prefix = prefix
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.prefix):
+            if "gzip" in accepted_encodings(Headers(scope=scope).get("accept-encoding", "")):
+                responder = ApiGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+                await responder(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
@@ -0,0 +1,23 @@
+"""Runtime settings, read from DF_* environment variables or a .env file"""
+
+from pathlib import Path
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="DF_", env_file=".env", extra="ignore")
+
+    # Request metrics and the /metrics endpoint
+    metrics_enabled: bool = True
+    # Requests at least this slow (seconds) are counted and, if profiled, dumped
+    slow_request_seconds: float = 1.0
+    # Fraction of requests run under cProfile (0 disables profiling)
+    profile_sample_rate: float = 0.0
+    profile_dir: Path = Path("profiles")
+
+    # Load the data stores in the background at startup; otherwise on first use
+    warm_up: bool = True
+
+
+settings = Settings()
@@ -1,19 +1,51 @@
-from fastapi import FastAPI
+# Imported first so the startup timer covers every import below
+from app.startup import data_ready, startup, warm_up
+
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
 import os
 from pathlib import Path
 
+from app import metrics
+from app.api import caching
+from app.api.caching import IMMUTABLE_CACHE_CONTROL
 from app.api.routes import locations, species, density
+from app.api.spa_shell import SpaShell
+from app.api.static_files import ApiGZipMiddleware, PrecompressedStaticFiles
+from app.config import settings
+from app.services import density as density_service
+from app.services.location_bundle import bundle_builder
+from app.services.location_store import location_store
+from app.services.species_store import species_store
+
+startup.mark("imports")
 
 # Get the project root directory
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the data stores in the background; requests are served meanwhile"""
+    startup.mark("server start")
+    print(f"Startup: {startup.summary()}")
+    task = None
+    if settings.warm_up:
+        task = asyncio.create_task(warm_up())
+    else:
+        startup.ready = True
+    yield
+    if task is not None:
+        task.cancel()
+
+
 app = FastAPI(
     title="Disappearing Florida API",
     description="API for Florida habitat loss visualization and sustainable development tools",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS middleware - adjust origins for production
@@ -28,34 +60,69 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress dynamic API JSON; static files are served from precompressed variants
+app.add_middleware(ApiGZipMiddleware)
+
+# Outermost, so timings and byte counts cover everything the client sees
+if settings.metrics_enabled:
+    app.add_middleware(
+        metrics.MetricsMiddleware,
+        slow_request_seconds=settings.slow_request_seconds,
+        profile_sample_rate=settings.profile_sample_rate,
+        profile_dir=settings.profile_dir,
+    )
+    metrics.register_cache("locations", location_store.cache_stats)
+    metrics.register_cache("species", species_store.cache_stats)
+    metrics.register_cache("density", density_service.cache_stats)
+    metrics.register_cache("bundles", bundle_builder.cache_stats)
+    metrics.register_cache("etag", caching.cache_stats)
+
 # Include API routers
-app.include_router(locations.router, prefix="/api/locations", tags=["locations"])
-app.include_router(species.router, prefix="/api/species", tags=["species"])
+# Until the first load finishes these wait for it in a worker thread
+app.include_router(locations.router, prefix="/api/locations", tags=["locations"], dependencies=[Depends(data_ready)])
+app.include_router(species.router, prefix="/api/species", tags=["species"], dependencies=[Depends(data_ready)])
 app.include_router(density.router, prefix="/api/density", tags=["density"])
 
+# Timeline frames are named by capture date and only change when the imagery
+# is re-normalized, so clients may reuse them for a week without revalidating
+TIMELINE_CACHE_CONTROL = "public, max-age=604800, immutable"
+
 # Serve static files
 static_dir = BASE_DIR / "static"
 if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
+    app.mount(
+        "/static",
+        PrecompressedStaticFiles(directory=str(static_dir), cache_rules=[("images/timelines/", TIMELINE_CACHE_CONTROL)]),
+        name="static",
+    )
 
 # Serve Vue frontend build (for production)
 frontend_dist = BASE_DIR / "frontend" / "dist"
 if frontend_dist.exists():
     # Mount the assets directory for static files (JS, CSS, images)
-    app.mount("/assets", StaticFiles(directory=str(frontend_dist / "assets")), name="assets")
+    # Vite content-hashes every file name under assets/
+    app.mount(
+        "/assets",
+        PrecompressedStaticFiles(directory=str(frontend_dist / "assets"), cache_rules=[("", IMMUTABLE_CACHE_CONTROL)]),
+        name="assets",
+    )
+
+# index.html is kept in memory and re-read only when it changes
+frontend_shell = SpaShell(frontend_dist / "index.html")
+static_shell = SpaShell(static_dir / "index.html")
 
 
 @app.get("/")
-async def root():
+async def root(request: Request):
     """Root endpoint - serve Vue app or fallback"""
-    frontend_index = frontend_dist / "index.html"
-    if frontend_index.exists():
-        return FileResponse(str(frontend_index))
+    response = frontend_shell.response(request)
+    if response is not None:
+        return response
 
     # Fallback if Vue build doesn't exist
-    static_index = static_dir / "index.html"
-    if static_index.exists():
-        return FileResponse(str(static_index))
+    response = static_shell.response(request)
+    if response is not None:
+        return response
 
     return {
         "message": "Disappearing Florida API",
@@ -67,24 +134,34 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "version": "0.1.0"}
+    return {"status": "healthy", "version": "0.1.0", "startup": startup.report()}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def get_metrics():
+        """Prometheus metrics"""
+        return Response(content=metrics.render(), media_type=metrics.PROMETHEUS_MEDIA_TYPE)
 
 
 @app.get("/{full_path:path}")
-async def serve_spa(full_path: str):
+async def serve_spa(full_path: str, request: Request):
     """Catch-all route to serve Vue SPA for client-side routing"""
     # Don't interfere with API routes, docs, or static files
     if full_path.startswith(("api/", "docs", "redoc", "openapi.json", "static/", "assets/")):
         return {"detail": "Not found"}
 
     # Serve Vue app index.html for all other routes
-    frontend_index = frontend_dist / "index.html"
-    if frontend_index.exists():
-        return FileResponse(str(frontend_index))
+    response = frontend_shell.response(request)
+    if response is not None:
+        return response
 
     return {"detail": "Frontend not built"}
 
 
+startup.mark("app setup")
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -0,0 +1,254 @@
+"""
+Low-overhead request metrics, exported in the Prometheus text format.
+
+MetricsMiddleware records per-route latency histograms and request/response
+byte counts; `timed(phase)` accumulates time spent in phases such as data
+load, validation and serialization; caches registered with
+`register_cache` report hit and miss counts at scrape time. Recording is a
+few integer updates under a lock, so it stays on in production.
+
+A sampled fraction of requests can run under cProfile. When a sampled
+request turns out slow, its profile is written to the profile directory for
+inspection with pstats or snakeviz. The profiler sees every coroutine the
+event loop runs meanwhile, not only the sampled request.
+"""
+
+import cProfile
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import anyio
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Latency buckets (seconds), from sub-millisecond cache hits to slow imagery
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels: Labels = (), amount: float = 1) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, label_names: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(buckets)
+        # Per label set: [per-bucket counts (last is +Inf), sum, count]
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Labels, value: float) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(s[0]), s[1], s[2]) for labels, s in self._series.items()]
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+            label_text = _format_labels(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {total:.6f}")
+            lines.append(f"{self.name}_count{label_text} {count}")
+        return lines
+
+
+REQUEST_SECONDS = Histogram("df_http_request_duration_seconds", "Request latency by route", ("method", "route"))
+REQUESTS_TOTAL = Counter("df_http_requests_total", "Requests by route and status", ("method", "route", "status"))
+REQUEST_BYTES = Counter("df_http_request_bytes_total", "Request body bytes by route", ("method", "route"))
+RESPONSE_BYTES = Counter("df_http_response_bytes_total", "Response body bytes sent by route", ("method", "route"))
+SLOW_REQUESTS = Counter("df_http_slow_requests_total", "Requests slower than the slow-request threshold", ("method", "route"))
+PHASE_SECONDS = Histogram("df_phase_duration_seconds", "Time spent in instrumented phases", ("phase",))
+
+METRICS = [REQUEST_SECONDS, REQUESTS_TOTAL, REQUEST_BYTES, RESPONSE_BYTES, SLOW_REQUESTS, PHASE_SECONDS]
+
+# name -> function returning {"hits": int, "misses": int, ...}
+_caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+
+# Phase durations of the request being handled, for slow-request reports
+_request_phases: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_phases", default=None)
+
+
+def register_cache(name: str, stats: Callable[[], Dict[str, int]]) -> None:
+    """Report a cache's hit/miss counters (and size, if given) on every scrape"""
+    _caches[name] = stats
+
+
+@contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """Record the time spent in the block under a phase name"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe((phase,), elapsed)
+        phases = _request_phases.get()
+        if phases is not None:
+            phases[phase] = phases.get(phase, 0.0) + elapsed
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format"""
+    lines: List[str] = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+
+    stats = {}
+    for name, collect in sorted(_caches.items()):
+        try:
+            stats[name] = collect()
+        except Exception as e:
+            print(f"Error collecting cache stats for {name}: {e}")
+    for key, kind, help_text in (
+        ("hits", "counter", "Cache hits"),
+        ("misses", "counter", "Cache misses"),
+        ("size", "gauge", "Entries currently cached"),
+    ):
+        metric = f"df_cache_{key}" + ("_total" if kind == "counter" else "")
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, values in stats.items():
+            if key in values:
+                lines.append(f'{metric}{{cache="{_escape(name)}"}} {values[key]}')
+    return "\n".join(lines) + "\n"
+
+
+def route_label(scope: Scope) -> str:
+    """Route template (not the raw path) so label cardinality stays bounded"""
+    route = scope.get("route")
+    if route is not None and getattr(route, "path", None):
+        return route.path
+    # Static mounts set root_path to their prefix
+    root_path = scope.get("root_path", "")
+    return root_path or "<unmatched>"
+
+
+class MetricsMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        slow_request_seconds: float = 1.0,
+        profile_sample_rate: float = 0.0,
+        profile_dir: Path = Path("profiles"),
+    ) -> None:
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_dir = profile_dir
+        # cProfile allows one active profiler per thread
+        self._profiling = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_bytes = 0
+        response_bytes = 0
+        status = 500
+
+        async def counting_receive() -> Message:
+            nonlocal request_bytes
+            message = await receive()
+            if message["type"] == "http.request":
+                request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal response_bytes, status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        profiler = None
+        if self.profile_sample_rate > 0 and not self._profiling and random.random() < self.profile_sample_rate:
+            self._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        phases_token = _request_phases.set({})
+        start = time.perf_counter()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            duration = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+            phases = _request_phases.get()
+            _request_phases.reset(phases_token)
+
+            method = scope["method"]
+            route = route_label(scope)
+            REQUEST_SECONDS.observe((method, route), duration)
+            REQUESTS_TOTAL.inc((method, route, str(status)))
+            REQUEST_BYTES.inc((method, route), request_bytes)
+            RESPONSE_BYTES.inc((method, route), response_bytes)
+
+            if duration >= self.slow_request_seconds:
+                SLOW_REQUESTS.inc((method, route))
+                breakdown = ", ".join(f"{name}={seconds * 1000:.1f}ms" for name, seconds in sorted(phases.items()))
+                print(f"Slow request: {method} {scope['path']} {status} in {duration * 1000:.0f}ms"
+                      + (f" ({breakdown})" if breakdown else ""))
+                if profiler is not None:
+                    await anyio.to_thread.run_sync(self._dump_profile, profiler, method, route, duration)
+
+    def _dump_profile(self, profiler: cProfile.Profile, method: str, route: str, duration: float) -> None:
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        path = self.profile_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{method}-{slug}-{duration * 1000:.0f}ms.prof"
+        try:
+            self.profile_dir.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(str(path))
+        except OSError as e:
+            print(f"Error writing profile {path}: {e}")
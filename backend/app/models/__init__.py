@@ -1,6 +1,7 @@
 from .location import Location, LocationDetail
 from .species import Species, SpeciesImpact
 from .density import DensityCalculation, DevelopmentPattern
+from .bundle import LocationBundle
 
 __all__ = [
     "Location",
@@ -9,4 +10,5 @@ __all__ = [
     "SpeciesImpact",
     "DensityCalculation",
     "DevelopmentPattern",
+    "LocationBundle",
 ]
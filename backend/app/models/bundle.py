@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import List, Optional, Union
+from app.models.density import DevelopmentPattern
+from app.models.location import LocationDetail, LocationDetailCompact
+from app.models.species import Species
+
+
+class LocationDensity(BaseModel):
+    """Density metadata for a location page"""
+    density_data: Optional[dict] = None
+    patterns: List[DevelopmentPattern]
+
+
+class LocationBundle(BaseModel):
+    """Everything a location page needs in one response; sections not requested are omitted"""
+    location: Optional[Union[LocationDetail, LocationDetailCompact]] = None
+    species: Optional[List[Species]] = None
+    density: Optional[LocationDensity] = None
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
 
 class DevelopmentPattern(BaseModel):
@@ -31,3 +31,39 @@ class DensityResult(BaseModel):
     estimated_co2_tons_per_year: float
     vehicle_miles_per_year: float
     pattern_used: DevelopmentPattern
+
+
+class PopulationRange(BaseModel):
+    """Evenly spaced populations, like range(start, stop, step)"""
+    start: int
+    stop: int
+    step: int = 1
+
+
+class DensitySweep(BaseModel):
+    """Input for a batch density calculation over a grid of inputs"""
+    populations: Optional[List[int]] = None
+    population_range: Optional[PopulationRange] = None
+    people_per_unit: List[float] = [2.5]
+    pattern_ids: Optional[List[str]] = None  # predefined patterns, default all
+    patterns: Optional[List[DevelopmentPattern]] = None  # custom patterns
+
+
+class DensitySweepSeries(BaseModel):
+    """Results for one pattern and people_per_unit, one value per population"""
+    pattern_id: str
+    people_per_unit: float
+    total_units_needed: List[int]
+    residential_acres: List[float]
+    infrastructure_acres: List[float]
+    total_acres: List[float]
+    comparison_football_fields: List[float]
+    estimated_co2_tons_per_year: List[float]
+    vehicle_miles_per_year: List[float]
+
+
+class DensitySweepResult(BaseModel):
+    """Columnar result grid from a density sweep"""
+    populations: List[int]
+    patterns: List[DevelopmentPattern]
+    series: List[DensitySweepSeries]
@@ -3,6 +3,25 @@ from typing import List, Optional
 from datetime import datetime
 
 
+class ImageVariant(BaseModel):
+    """One encoded rendition of a time point image"""
+    url: str
+    format: str  # "webp" or "avif"
+    width: int
+    height: int
+    bytes: int
+
+
+class TilePyramidInfo(BaseModel):
+    """Deep-zoom tile pyramid available for a time point"""
+    url_template: str  # contains {z}, {x} and {y}
+    width: int
+    height: int
+    tile_size: int
+    max_zoom: int
+    format: str
+
+
 class TimePoint(BaseModel):
     """Satellite imagery time point"""
     year: int
@@ -12,7 +31,15 @@ class TimePoint(BaseModel):
     image_url_mobile: Optional[str] = None  # 640w
     image_url_tablet: Optional[str] = None  # 1024w
     image_url_desktop: Optional[str] = None  # 1920w
+    # Every encoded variant with its size, so clients can pick the smallest acceptable one
+    image_variants: Optional[List[ImageVariant]] = None
+    tiles: Optional[TilePyramidInfo] = None
     description: Optional[str] = None
+    # Estimated from the imagery by scripts/estimate_habitat_loss.py
+    vegetation_acres: Optional[float] = None
+    impervious_acres: Optional[float] = None
+    habitat_loss_acres: Optional[float] = None  # cumulative since the first time point
+    habitat_loss_acres_change: Optional[float] = None  # since the previous time point
 
 
 class Location(BaseModel):
@@ -35,3 +62,33 @@ class LocationDetail(Location):
     density_data: Optional[dict] = None
     habitat_loss_acres: Optional[float] = None
     habitat_loss_percentage: Optional[float] = None
+
+
+class LocationDetailCompact(Location):
+    """LocationDetail with time points reduced to their dates; fetch them from /time_points"""
+    description_full: str
+    timeline: List[str]  # time point dates, chronological
+    affected_species_ids: List[str]
+    density_data: Optional[dict] = None
+    habitat_loss_acres: Optional[float] = None
+    habitat_loss_percentage: Optional[float] = None
+
+
+class LocationCluster(BaseModel):
+    """Several nearby locations merged into one map marker"""
+    latitude: float
+    longitude: float
+    count: int
+    bbox: List[float]  # [minLon, minLat, maxLon, maxLat] of the members; zoom here to split it
+
+
+class LocationMapView(BaseModel):
+    """Locations and clusters visible in a map viewport"""
+    locations: List[Location]
+    clusters: List[LocationCluster]
+
+
+class LocationPage(BaseModel):
+    """One page of the location listing; items hold only the requested fields"""
+    items: List[dict]
+    next_cursor: Optional[str] = None
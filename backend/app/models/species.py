@@ -26,6 +26,7 @@ class Species(BaseModel):
     scientific_name: str
     conservation_status: str  # e.g., "Endangered", "Threatened", "Vulnerable"
     image_url: Optional[str] = None
+    image_attribution: Optional[str] = None
     description: str
     habitat_requirements: str
     population_trend: str  # e.g., "Declining", "Stable", "Unknown"
@@ -0,0 +1,412 @@
+"""
+Compiled location catalogue: every location, and the indexes over them, in
+one memory-mapped file.
+
+Lookups, listings and map queries are answered straight from the mapping,
+so worker processes share a single copy of the catalogue through the page
+cache. A worker's own memory holds only the header, the small group, grid
+and species tables, and a bounded cache of recently used entries, whatever the number
+of locations.
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     magic b"DFLC", format version (u16), reserved (u16), location
+               count (u32), list ETag (32 bytes), then an (offset u64,
+               length u64) pair per section, in SECTIONS order
+    list       encoded JSON array of every location summary, served as-is
+    records    per location: id, summary JSON and detail JSON, back to back
+    index      per location, sorted by id: (record offset u64, id length u16,
+               summary length u32, detail length u32, detail ETag 32 bytes)
+    key_offsets  u64 offsets into keys, one per location plus an end offset
+    keys       per location, JSON array of its normalized SORT_KEYS values
+    points     (latitude, longitude) f64 pairs, in index order
+    positions  u32 index positions, referenced by the tables
+    species_offsets  u32 offsets into species_refs, one per location plus
+               an end offset
+    species_refs  per location, its affected_species_ids as u32 indexes
+               into the species table
+    species_locations  per species, encoded JSON array of the ids of the
+               locations listing it, in id order
+    tables     JSON: the listing order for each sort key, overall and per
+               county and ecosystem type, and the grid cells, as [start,
+               count] ranges of positions; and the species table, a
+               [species id, offset, length, ETag] row per species into
+               species_locations
+
+A catalogue is never modified in place: a new version is written next to it
+and renamed over it, so each worker maps the new file on its next refresh
+while requests holding the old mapping finish against it.
+"""
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+from collections.abc import Mapping, Sequence
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.api.caching import make_etag
+from app.models.location import Location, LocationDetail
+from app.services.location_listing import FILTER_FIELDS, SORT_KEYS, ListingIndex, SortedRun, normalize
+from app.services.location_views import TimelineViews
+from app.services.spatial_index import DEFAULT_CELL_SIZE, GridIndex
+
+CATALOGUE_PATH = Path(__file__).resolve().parent.parent / "data" / "locations.dflc"
+
+MAGIC = b"DFLC"
+FORMAT_VERSION = 3
+HEADER = struct.Struct("<4sHHI32s")
+SECTIONS = (
+    "list", "records", "index", "key_offsets", "keys", "points", "positions",
+    "species_offsets", "species_refs", "species_locations", "tables",
+)
+SECTION_ENTRY = struct.Struct("<QQ")
+INDEX_ENTRY = struct.Struct("<QHII32s")
+
+# Entries, with their decoded models and encoded views, kept per worker
+MAX_CACHED_ENTRIES = 4096
+
+
+class CatalogueEntry(TimelineViews):
+    """
+    A location backed by a catalogue mapping.
+
+    Provides the same attributes as LocationEntry; the JSON bodies are sliced
+    from the mapping on each access and the models are decoded on first use.
+    """
+
+    def __init__(self, catalogue: "Catalogue", position: int):
+        offset, id_length, summary_length, detail_length, etag = catalogue.index_entry(position)
+        self.path = catalogue.path
+        self.signature = catalogue.signature
+        self.position = position
+        self._catalogue = catalogue
+        self.id = catalogue.buffer[offset:offset + id_length].decode()
+        self.detail_etag = f'"{etag.decode()}"'
+        self._buffer = catalogue.buffer
+        self._summary_start = offset + id_length
+        self._detail_start = self._summary_start + summary_length
+        self._detail_end = self._detail_start + detail_length
+
+    @property
+    def summary_json(self) -> bytes:
+        return self._buffer[self._summary_start:self._detail_start]
+
+    @property
+    def detail_json(self) -> bytes:
+        return self._buffer[self._detail_start:self._detail_end]
+
+    @property
+    def species_ids(self) -> List[str]:
+        return self._catalogue.species_ids_at(self.position)
+
+    @cached_property
+    def summary(self) -> Location:
+        return Location.model_validate_json(self.summary_json)
+
+    @cached_property
+    def detail(self) -> LocationDetail:
+        return LocationDetail.model_validate_json(self.detail_json)
+
+
+class PositionView(Sequence):
+    """Values derived on access from a run of index positions in the mapping"""
+
+    def __init__(self, positions: memoryview, value: Callable[[int], Any]):
+        self._positions = positions
+        self._value = value
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._value(position) for position in self._positions[i]]
+        return self._value(self._positions[i])
+
+
+class Catalogue(Mapping):
+    """Read-only view of a compiled catalogue file: a mapping of location id to entry"""
+
+    def __init__(self, path: Path):
+        if sys.byteorder != "little":
+            raise ValueError("location catalogues can only be mapped on little-endian hosts")
+        self.path = path
+        with open(path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self.signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            # The mapping outlives the descriptor and stays valid if the file is replaced
+            self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.buffer) < HEADER.size + len(SECTIONS) * SECTION_ENTRY.size:
+            raise ValueError(f"{path} is truncated")
+        magic, version, _, self.count, list_etag = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a version {FORMAT_VERSION} location catalogue; "
+                             f"rebuild it with scripts/build_location_catalogue.py")
+
+        view = memoryview(self.buffer)
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = SECTION_ENTRY.unpack_from(self.buffer, HEADER.size + i * SECTION_ENTRY.size)
+            if offset + length > len(self.buffer):
+                raise ValueError(f"{path} is truncated")
+            sections[name] = view[offset:offset + length]
+        if len(sections["index"]) != self.count * INDEX_ENTRY.size:
+            raise ValueError(f"{path} has a corrupt index")
+
+        # Served without copying; Starlette accepts a memoryview body
+        self.list_json = sections["list"]
+        self.list_etag = f'"{list_etag.decode()}"'
+        self._index = sections["index"]
+        self._keys_start = SECTION_ENTRY.unpack_from(self.buffer, HEADER.size + SECTIONS.index("keys") * SECTION_ENTRY.size)[0]
+        self._key_offsets = sections["key_offsets"].cast("Q")
+        self._points = sections["points"].cast("d")
+        self._positions = sections["positions"].cast("I")
+        self._species_offsets = sections["species_offsets"].cast("I")
+        self._species_refs = sections["species_refs"].cast("I")
+        self._species_locations = sections["species_locations"]
+        self._tables = json.loads(bytes(sections["tables"]))
+        self._species_ids = [row[0] for row in self._tables["species"]]
+        self._species = {species_id: (offset, length, etag) for species_id, offset, length, etag in self._tables["species"]}
+
+        self._entries: "OrderedDict[int, CatalogueEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def index_entry(self, position: int) -> Tuple[int, int, int, int, bytes]:
+        return INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)
+
+    def id_at(self, position: int) -> str:
+        offset, id_length, _, _, _ = INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)
+        return self.buffer[offset:offset + id_length].decode()
+
+    def position(self, location_id: str) -> Optional[int]:
+        """Index position of a location id (binary search), or None"""
+        i = bisect_left(range(self.count), location_id, key=self.id_at)
+        return i if i < self.count and self.id_at(i) == location_id else None
+
+    def entry_at(self, position: int) -> CatalogueEntry:
+        with self._lock:
+            entry = self._entries.get(position)
+            if entry is not None:
+                self._entries.move_to_end(position)
+                return entry
+        entry = CatalogueEntry(self, position)
+        with self._lock:
+            self._entries[position] = entry
+            if len(self._entries) > MAX_CACHED_ENTRIES:
+                self._entries.popitem(last=False)
+        return entry
+
+    def sort_key_at(self, position: int, sort: str) -> Tuple[str, str]:
+        """Same value as location_listing.sort_key() for the entry at position"""
+        start = self._keys_start + self._key_offsets[position]
+        end = self._keys_start + self._key_offsets[position + 1]
+        return json.loads(self.buffer[start:end])[SORT_KEYS.index(sort)], self.id_at(position)
+
+    def summary_json_at(self, position: int) -> bytes:
+        offset, id_length, summary_length, _, _ = INDEX_ENTRY.unpack_from(self._index, position * INDEX_ENTRY.size)
+        return self.buffer[offset + id_length:offset + id_length + summary_length]
+
+    def point_at(self, position: int) -> Tuple[int, float, float]:
+        return position, self._points[2 * position], self._points[2 * position + 1]
+
+    def _run(self, start: int, count: int) -> memoryview:
+        return self._positions[start:start + count]
+
+    @cached_property
+    def listing(self) -> ListingIndex:
+        """Listing index over the precomputed sort orders"""
+        def run(span: List[int], sort: str) -> SortedRun:
+            positions = self._run(*span)
+            return SortedRun.from_sequences(
+                PositionView(positions, lambda p: self.sort_key_at(p, sort)),
+                PositionView(positions, self.entry_at),
+            )
+
+        tables = self._tables
+        return ListingIndex.from_runs(
+            {sort: run(tables["orders"][sort], sort) for sort in SORT_KEYS},
+            {
+                (field, value): {sort: run(span, sort) for sort, span in spans.items()}
+                for field, groups in tables["groups"].items()
+                for value, spans in groups.items()
+            },
+        )
+
+    @cached_property
+    def grid(self) -> GridIndex:
+        """Spatial index over the precomputed grid cells; its points carry index positions, not ids"""
+        grid = self._tables["grid"]
+        return GridIndex.from_cells(
+            {(col, row): PositionView(self._run(start, count), self.point_at)
+             for col, row, start, count in grid["cells"]},
+            grid["cell_size"],
+        )
+
+    def species_ids_at(self, position: int) -> List[str]:
+        """affected_species_ids of the location at position"""
+        refs = self._species_refs[self._species_offsets[position]:self._species_offsets[position + 1]]
+        return [self._species_ids[ref] for ref in refs]
+
+    def listed_species(self) -> List[str]:
+        """Ids of the species listed by any location"""
+        return list(self._species_ids)
+
+    def species_locations_json(self, species_id: str) -> Optional[Tuple[memoryview, str]]:
+        """Encoded array of the ids of the locations listing a species, and its ETag, or None if none do"""
+        row = self._species.get(species_id)
+        if row is None:
+            return None
+        offset, length, etag = row
+        return self._species_locations[offset:offset + length], etag
+
+    def __getitem__(self, location_id: str) -> CatalogueEntry:
+        position = self.position(location_id)
+        if position is None:
+            raise KeyError(location_id)
+        return self.entry_at(position)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.id_at(i) for i in range(self.count))
+
+    def values(self) -> Iterator[CatalogueEntry]:
+        """Every entry in id order, without filling the entry cache"""
+        return (CatalogueEntry(self, i) for i in range(self.count))
+
+
+def write_catalogue(locations: Iterable[LocationDetail], output_path: Path) -> int:
+    """Compile validated locations into a catalogue file; returns the number written"""
+    summaries = []
+    rows = []
+    records = bytearray()
+    for detail in locations:
+        summary = Location(**detail.model_dump(include=set(Location.model_fields)))
+        summary_json = summary.model_dump_json().encode()
+        detail_json = detail.model_dump_json().encode()
+        location_id = detail.id.encode()
+        summaries.append(summary_json)
+        rows.append((
+            detail.id, len(records), len(location_id), len(summary_json), len(detail_json),
+            make_etag(detail_json).strip('"').encode(),
+            [normalize(getattr(summary, key)) for key in SORT_KEYS],
+            summary.latitude, summary.longitude, detail.affected_species_ids,
+        ))
+        records += location_id + summary_json + detail_json
+
+    rows.sort(key=lambda row: row[0])
+    for previous, row in zip(rows, rows[1:]):
+        if previous[0] == row[0]:
+            raise ValueError(f"duplicate location id '{row[0]}'")
+
+    list_json = b"[" + b",".join(summaries) + b"]"
+    keys = [row[6] for row in rows]
+    positions: List[int] = []
+
+    def add_run(members: Iterable[int]) -> List[int]:
+        start = len(positions)
+        positions.extend(members)
+        return [start, len(positions) - start]
+
+    def ordered(members: List[int], sort: int) -> List[int]:
+        return sorted(members, key=lambda p: (keys[p][sort], rows[p][0]))
+
+    everyone = list(range(len(rows)))
+    groups: Dict[str, Dict[str, List[int]]] = {field: defaultdict(list) for field in FILTER_FIELDS}
+    for p in everyone:
+        for field in FILTER_FIELDS:
+            groups[field][keys[p][SORT_KEYS.index(field)]].append(p)
+
+    species: Dict[str, List[str]] = defaultdict(list)
+    for row in rows:
+        for species_id in dict.fromkeys(row[9]):
+            species[species_id].append(row[0])
+    species_ids = sorted(species)
+    species_refs = {species_id: i for i, species_id in enumerate(species_ids)}
+    refs = [species_refs[species_id] for row in rows for species_id in row[9]]
+    species_offsets = [0]
+    for row in rows:
+        species_offsets.append(species_offsets[-1] + len(row[9]))
+
+    species_locations = bytearray()
+    species_table = []
+    for species_id in species_ids:
+        array = json.dumps(species[species_id], separators=(",", ":"), ensure_ascii=False).encode()
+        species_table.append([species_id, len(species_locations), len(array), make_etag(array)])
+        species_locations += array
+
+    grid = GridIndex(((p, row[7], row[8]) for p, row in enumerate(rows)), DEFAULT_CELL_SIZE)
+    tables = {
+        "orders": {sort: add_run(ordered(everyone, i)) for i, sort in enumerate(SORT_KEYS)},
+        "groups": {
+            field: {
+                value: {sort: add_run(ordered(members, i)) for i, sort in enumerate(SORT_KEYS)}
+                for value, members in values.items()
+            }
+            for field, values in groups.items()
+        },
+        "grid": {
+            "cell_size": grid.cell_size,
+            "cells": [[col, row, *add_run(p for p, _, _ in points)] for (col, row), points in grid.cells.items()],
+        },
+        "species": species_table,
+    }
+
+    key_blobs = [json.dumps(row[6], separators=(",", ":")).encode() for row in rows]
+    key_offsets = [0]
+    for blob in key_blobs:
+        key_offsets.append(key_offsets[-1] + len(blob))
+
+    def align(offset: int) -> int:
+        return offset + (-offset % 8)
+
+    layout = []
+    position = HEADER.size + len(SECTIONS) * SECTION_ENTRY.size
+
+    def place(data: bytes) -> bytes:
+        nonlocal position
+        start = align(position)
+        layout.append((start, len(data)))
+        padding = start - position
+        position = start + len(data)
+        return b"\0" * padding + data
+
+    # Records follow the list, so their absolute offsets are known before placing them
+    records_start = align(align(position) + len(list_json))
+    index = b"".join(
+        INDEX_ENTRY.pack(records_start + offset, id_length, summary_length, detail_length, etag)
+        for _, offset, id_length, summary_length, detail_length, etag, *_ in rows
+    )
+    body = b"".join([
+        place(list_json),
+        place(bytes(records)),
+        place(index),
+        place(struct.pack(f"<{len(key_offsets)}Q", *key_offsets)),
+        place(b"".join(key_blobs)),
+        place(struct.pack(f"<{2 * len(rows)}d", *(v for row in rows for v in (row[7], row[8])))),
+        place(struct.pack(f"<{len(positions)}I", *positions)),
+        place(struct.pack(f"<{len(species_offsets)}I", *species_offsets)),
+        place(struct.pack(f"<{len(refs)}I", *refs)),
+        place(bytes(species_locations)),
+        place(json.dumps(tables, separators=(",", ":")).encode()),
+    ])
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(rows), make_etag(list_json).strip('"').encode()))
+        for offset, length in layout:
+            f.write(SECTION_ENTRY.pack(offset, length))
+        f.write(body)
+    # Atomic swap so a running server never maps a half-written catalogue
+    os.replace(tmp_path, output_path)
+    return len(rows)
@@ -0,0 +1,180 @@
+"""
+Precomputed change masks and heatmaps between consecutive timeline frames.
+
+For each pair of dates two files are stored under
+app/data/changes/<location-id>/:
+
+    <from>_<to>.mask  header (magic b"DFCM", version u16, reserved u16,
+                      width u32, height u32) followed by the zlib-compressed
+                      np.packbits() of the boolean change mask, row-major
+    <from>_<to>.png   downsampled RGBA heatmap of change intensity
+
+plus a changes.json manifest recording, per pair, the cache key (a hash of
+both input frames and the parameters), the mask size and the changed fraction.
+"""
+
+import hashlib
+import io
+import json
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from app.services.files import file_signature
+
+if TYPE_CHECKING:
+    import numpy as np
+
+CHANGES_DIR = Path(__file__).resolve().parent.parent / "data" / "changes"
+MANIFEST_NAME = "changes.json"
+
+MAGIC = b"DFCM"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+
+DEFAULT_THRESHOLD = 40  # mean absolute RGB difference, 0-255
+DEFAULT_HEATMAP_SCALE = 8
+
+
+def pair_name(from_date: str, to_date: str) -> str:
+    return f"{from_date}_{to_date}"
+
+
+def cache_key(before: Path, after: Path, threshold: int, heatmap_scale: int) -> str:
+    """Hash of both input frames and the parameters; unchanged key means cached output is valid"""
+    digest = hashlib.sha256(f"{FORMAT_VERSION}:{threshold}:{heatmap_scale}".encode())
+    for path in (before, after):
+        with open(path, "rb") as f:
+            digest.update(hashlib.file_digest(f, "sha256").digest())
+    return digest.hexdigest()[:16]
+
+
+def encode_mask(mask: "np.ndarray") -> bytes:
+    import numpy as np
+
+    height, width = mask.shape
+    packed = np.packbits(mask, axis=None)
+    return HEADER.pack(MAGIC, FORMAT_VERSION, 0, width, height) + zlib.compress(packed.tobytes(), 9)
+
+
+def decode_mask_header(data: bytes) -> Tuple[int, int]:
+    """(width, height) of an encoded mask"""
+    magic, version, _, width, height = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Not a version {FORMAT_VERSION} change mask")
+    return width, height
+
+
+def decode_mask(data: bytes) -> "np.ndarray":
+    import numpy as np
+
+    width, height = decode_mask_header(data)
+    packed = np.frombuffer(zlib.decompress(data[HEADER.size:]), dtype=np.uint8)
+    return np.unpackbits(packed, count=width * height).reshape(height, width).astype(bool)
+
+
+def compute_change(
+    before_path: Path,
+    after_path: Path,
+    output_dir: Path,
+    name: str,
+    threshold: int = DEFAULT_THRESHOLD,
+    heatmap_scale: int = DEFAULT_HEATMAP_SCALE,
+) -> Dict[str, float]:
+    """
+    Compute and write <name>.mask and <name>.png for one pair of frames.
+
+    The later frame is resized to the earlier one if their sizes differ.
+    Returns the manifest entry for the pair.
+    """
+    # NumPy and Pillow are only needed to build masks, not to serve them
+    import numpy as np
+    from PIL import Image
+
+    with Image.open(before_path) as img:
+        before = img.convert("RGB")
+    with Image.open(after_path) as img:
+        after = img.convert("RGB")
+    if after.size != before.size:
+        after = after.resize(before.size, Image.LANCZOS)
+
+    difference = np.abs(np.asarray(before, dtype=np.int16) - np.asarray(after, dtype=np.int16))
+    intensity = difference.mean(axis=2).astype(np.uint8)
+    mask = intensity > threshold
+
+    # Box-filter the intensity down, then map it to a yellow-to-red overlay
+    # whose opacity follows the amount of change
+    width, height = before.size
+    small = Image.fromarray(intensity).resize(
+        (max(1, width // heatmap_scale), max(1, height // heatmap_scale)), Image.BOX
+    )
+    level = np.asarray(small, dtype=np.float32) / 255.0
+    heat = np.empty(level.shape + (4,), dtype=np.uint8)
+    heat[..., 0] = 255
+    heat[..., 1] = (255 * (1 - level)).astype(np.uint8)
+    heat[..., 2] = 0
+    heat[..., 3] = (255 * np.clip(level * 2, 0, 1)).astype(np.uint8)
+    heatmap = io.BytesIO()
+    Image.fromarray(heat, "RGBA").save(heatmap, "PNG", optimize=True)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    _write_atomic(output_dir / f"{name}.mask", encode_mask(mask))
+    _write_atomic(output_dir / f"{name}.png", heatmap.getvalue())
+
+    return {
+        "width": width,
+        "height": height,
+        "changed_fraction": round(float(np.count_nonzero(mask)) / mask.size, 4),
+    }
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class ChangeStore:
+    """Serves precomputed masks and heatmaps, rereading a manifest only when it changes"""
+
+    def __init__(self, changes_dir: Path = CHANGES_DIR):
+        self.changes_dir = changes_dir
+        self._manifests: Dict[Path, Tuple[Tuple[int, int, int], dict]] = {}
+        self._lock = threading.Lock()
+
+    def _manifest(self, location_id: str) -> dict:
+        path = self.changes_dir / location_id / MANIFEST_NAME
+        signature = file_signature(path)
+        if signature is None:
+            return {}
+        cached = self._manifests.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with self._lock:
+            try:
+                with open(path, "r") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {path}: {e}")
+                return {}
+            self._manifests[path] = (signature, manifest)
+            return manifest
+
+    def get(self, location_id: str, from_date: str, to_date: str, kind: str) -> Optional[Tuple[bytes, str]]:
+        """(file bytes, cache key) for a pair's 'mask' or 'heatmap', or None"""
+        name = pair_name(from_date, to_date)
+        entry = self._manifest(location_id).get(name)
+        if entry is None:
+            return None
+        suffix = ".mask" if kind == "mask" else ".png"
+        try:
+            data = (self.changes_dir / location_id / f"{name}{suffix}").read_bytes()
+        except OSError:
+            return None
+        return data, entry["key"]
+
+
+change_store = ChangeStore()
@@ -0,0 +1,221 @@
+"""Land use and emissions estimates for development patterns"""
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Dict, List, Sequence, Tuple
+
+from app.models.density import DevelopmentPattern, DensityResult, DensitySweepResult, DensitySweepSeries
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Predefined development patterns
+DEVELOPMENT_PATTERNS = [
+    DevelopmentPattern(
+        id="single-family-sprawl",
+        name="Single-Family Suburban Sprawl",
+        units_per_acre=2.5,
+        avg_unit_size_sqft=2200,
+        description="Typical low-density suburban development with large lots",
+        parking_spaces_per_unit=2.5,
+        road_width_feet=32,
+        typical_lot_coverage=0.25
+    ),
+    DevelopmentPattern(
+        id="townhomes",
+        name="Townhomes",
+        units_per_acre=8,
+        avg_unit_size_sqft=1600,
+        description="Medium-density attached housing",
+        parking_spaces_per_unit=2.0,
+        road_width_feet=28,
+        typical_lot_coverage=0.45
+    ),
+    DevelopmentPattern(
+        id="mixed-use-mid-rise",
+        name="Mixed-Use Mid-Rise",
+        units_per_acre=45,
+        avg_unit_size_sqft=950,
+        description="4-6 story buildings with retail on ground floor",
+        parking_spaces_per_unit=1.2,
+        road_width_feet=24,
+        typical_lot_coverage=0.65
+    ),
+    DevelopmentPattern(
+        id="high-rise",
+        name="High-Rise Urban",
+        units_per_acre=120,
+        avg_unit_size_sqft=850,
+        description="8+ story buildings in urban core",
+        parking_spaces_per_unit=0.8,
+        road_width_feet=24,
+        typical_lot_coverage=0.70
+    ),
+]
+
+PATTERNS_BY_ID = {pattern.id: pattern for pattern in DEVELOPMENT_PATTERNS}
+
+SQFT_PER_ACRE = 43560
+SQFT_PER_PARKING_SPACE = 300
+ACRES_PER_FOOTBALL_FIELD = 1.32  # including end zones
+CO2_LBS_PER_MILE = 0.89
+
+# Number of distinct (pattern, population, people_per_unit) results kept in memory
+RESULT_CACHE_SIZE = 4096
+
+
+def road_multiplier(units_per_acre: float) -> float:
+    """Extra land for roads and utilities, relative to residential acres"""
+    return 1.3 if units_per_acre < 5 else 1.15 if units_per_acre < 20 else 1.08
+
+
+def vmt_per_household(units_per_acre: float) -> int:
+    """Annual vehicle miles per household - lower density means more driving"""
+    return 25000 if units_per_acre < 5 else \
+           18000 if units_per_acre < 20 else \
+           10000 if units_per_acre < 50 else \
+           6000
+
+
+def calculate(pattern: DevelopmentPattern, population: int, people_per_unit: float) -> DensityResult:
+    """Calculate land use and emissions for a single population and pattern"""
+    # Calculate units needed
+    total_units = int(population / people_per_unit)
+
+    # Calculate residential acres
+    residential_acres = total_units / pattern.units_per_acre
+
+    # Estimate infrastructure (simplified - roads, parking, utilities)
+    # This is a rough approximation
+    parking_acres = (total_units * pattern.parking_spaces_per_unit * SQFT_PER_PARKING_SPACE) / SQFT_PER_ACRE
+    infrastructure_acres = residential_acres * (road_multiplier(pattern.units_per_acre) - 1) + parking_acres
+
+    total_acres = residential_acres + infrastructure_acres
+    football_fields = total_acres / ACRES_PER_FOOTBALL_FIELD
+
+    # Estimate vehicle miles and CO2 (very simplified)
+    total_vmt = total_units * vmt_per_household(pattern.units_per_acre)
+
+    # CO2 emissions (convert lbs to tons)
+    co2_tons = (total_vmt * CO2_LBS_PER_MILE) / 2000
+
+    return DensityResult(
+        total_units_needed=total_units,
+        residential_acres=round(residential_acres, 2),
+        infrastructure_acres=round(infrastructure_acres, 2),
+        total_acres=round(total_acres, 2),
+        comparison_football_fields=round(football_fields, 1),
+        estimated_co2_tons_per_year=round(co2_tons, 0),
+        vehicle_miles_per_year=total_vmt,
+        pattern_used=pattern
+    )
+
+
+def pattern_key(pattern: DevelopmentPattern) -> Tuple:
+    """Canonical, hashable form of a pattern: its field values in declaration order"""
+    return tuple(getattr(pattern, name) for name in DevelopmentPattern.model_fields)
+
+
+@lru_cache(maxsize=RESULT_CACHE_SIZE)
+def _calculate_for_key(key: Tuple, population: int, people_per_unit: float) -> DensityResult:
+    pattern = DevelopmentPattern(**dict(zip(DevelopmentPattern.model_fields, key)))
+    return calculate(pattern, population, people_per_unit)
+
+
+def calculate_cached(pattern: DevelopmentPattern, population: int, people_per_unit: float) -> DensityResult:
+    """
+    Memoized calculate().
+
+    Results are shared between callers and must not be mutated.
+    """
+    return _calculate_for_key(pattern_key(pattern), int(population), float(people_per_unit))
+
+
+def cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the result cache"""
+    info = _calculate_for_key.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+
+def clear_cache() -> None:
+    """Drop all memoized results and reset the counters"""
+    _calculate_for_key.cache_clear()
+
+
+def _round(values: "np.ndarray", ndigits: int) -> "np.ndarray":
+    """
+    Round like the builtin round().
+
+    np.round scales by 10**ndigits first, so values whose decimal expansion sits
+    just below a tie (0.475 is really 0.47499...) can round the other way.
+    Those near-ties are rare, so they are recomputed with round() individually.
+    """
+    import numpy as np
+
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), ndigits) for v in values[near_tie]]
+    return rounded
+
+
+def sweep(
+    patterns: Sequence[DevelopmentPattern],
+    populations: Sequence[int],
+    people_per_unit: Sequence[float],
+) -> DensitySweepResult:
+    """
+    Evaluate every (pattern, people_per_unit, population) combination at once.
+
+    The scalar formula in calculate() is applied with NumPy broadcasting over a
+    (patterns, people_per_unit, populations) grid, so the cost is a handful of
+    array operations regardless of how many points are requested.
+    """
+    # Imported on first use so single calculations and worker startup skip NumPy
+    import numpy as np
+
+    pop = np.asarray(populations, dtype=np.float64)[np.newaxis, np.newaxis, :]
+    ppu = np.asarray(people_per_unit, dtype=np.float64)[np.newaxis, :, np.newaxis]
+    units_per_acre = np.array([p.units_per_acre for p in patterns], dtype=np.float64)[:, np.newaxis, np.newaxis]
+    parking = np.array([p.parking_spaces_per_unit for p in patterns], dtype=np.float64)[:, np.newaxis, np.newaxis]
+    roads = np.array([road_multiplier(p.units_per_acre) for p in patterns])[:, np.newaxis, np.newaxis]
+    vmt = np.array([vmt_per_household(p.units_per_acre) for p in patterns], dtype=np.int64)[:, np.newaxis, np.newaxis]
+
+    # Truncate toward zero like int() in the scalar version
+    total_units = np.trunc(pop / ppu).astype(np.int64)
+    total_units = np.broadcast_to(total_units, (len(patterns),) + total_units.shape[1:])
+
+    residential_acres = total_units / units_per_acre
+    parking_acres = (total_units * parking * SQFT_PER_PARKING_SPACE) / SQFT_PER_ACRE
+    infrastructure_acres = residential_acres * (roads - 1) + parking_acres
+    total_acres = residential_acres + infrastructure_acres
+    football_fields = total_acres / ACRES_PER_FOOTBALL_FIELD
+    total_vmt = total_units * vmt
+    co2_tons = (total_vmt * CO2_LBS_PER_MILE) / 2000
+
+    columns = {
+        "total_units_needed": total_units,
+        "residential_acres": _round(residential_acres, 2),
+        "infrastructure_acres": _round(infrastructure_acres, 2),
+        "total_acres": _round(total_acres, 2),
+        "comparison_football_fields": _round(football_fields, 1),
+        "estimated_co2_tons_per_year": _round(co2_tons, 0),
+        "vehicle_miles_per_year": total_vmt.astype(np.float64),
+    }
+    # One tolist() per column is far cheaper than converting element by element
+    columns = {name: values.tolist() for name, values in columns.items()}
+
+    series: List[DensitySweepSeries] = []
+    for i, pattern in enumerate(patterns):
+        for j, ratio in enumerate(people_per_unit):
+            series.append(DensitySweepSeries(
+                pattern_id=pattern.id,
+                people_per_unit=ratio,
+                **{name: values[i][j] for name, values in columns.items()},
+            ))
+
+    return DensitySweepResult(
+        populations=list(populations),
+        patterns=list(patterns),
+        series=series,
+    )
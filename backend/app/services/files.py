@@ -0,0 +1,13 @@
+"""Small filesystem helpers shared by the data stores"""
+
+from pathlib import Path
+from typing import Optional, Tuple
+
+
+def file_signature(path: Path) -> Optional[Tuple[int, int, int]]:
+    """Return (inode, mtime_ns, size) for a file, or None if it is missing"""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
@@ -0,0 +1,121 @@
+"""
+Habitat loss estimates from a location's timeline imagery.
+
+Each frame is classified per pixel into vegetation, impervious surface or
+other (water, shadow, bare ground) using visible-band math, since the
+timeline frames are plain RGB captures:
+
+    vegetation  excess green  2g - r - b  above a threshold, where r, g, b are
+                chromatic coordinates (each band divided by R + G + B)
+    impervious  bright, low-saturation pixels (roofs, roads, concrete)
+
+Frames are classified in horizontal strips so the float intermediates never
+exceed one strip, whatever the frame size. Each frame is still decoded
+whole (Pillow cannot decode PNG or WebP a strip at a time), so peak memory
+is a few copies of one decoded uint8 RGB frame plus one strip of floats.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+SQ_METERS_PER_ACRE = 4046.8564224
+
+DEFAULT_STRIP_ROWS = 512
+VEGETATION_EXG_THRESHOLD = 0.05
+IMPERVIOUS_MIN_BRIGHTNESS = 0.55
+IMPERVIOUS_MAX_SATURATION = 0.18
+
+
+@dataclass
+class LandCover:
+    """Pixel counts for one classified frame"""
+    vegetation: int
+    impervious: int
+    total: int
+
+
+def classify_strip(rgb: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vegetation and impervious masks for an (H, W, 3) uint8 RGB strip"""
+    bands = rgb.astype(np.float32) / 255.0
+    r, g, b = bands[..., 0], bands[..., 1], bands[..., 2]
+
+    total = r + g + b
+    np.maximum(total, 1e-6, out=total)
+    excess_green = (2 * g - r - b) / total
+    vegetation = excess_green > VEGETATION_EXG_THRESHOLD
+
+    brightness = total / 3
+    high = np.maximum(np.maximum(r, g), b)
+    low = np.minimum(np.minimum(r, g), b)
+    saturation = (high - low) / np.maximum(high, 1e-6)
+    impervious = (brightness > IMPERVIOUS_MIN_BRIGHTNESS) & (saturation < IMPERVIOUS_MAX_SATURATION) & ~vegetation
+
+    return vegetation, impervious
+
+
+def classify_frame(rgb: np.ndarray, strip_rows: int = DEFAULT_STRIP_ROWS) -> LandCover:
+    """Count vegetation and impervious pixels in a frame, one strip at a time"""
+    vegetation = impervious = 0
+    for top in range(0, rgb.shape[0], strip_rows):
+        veg_mask, imp_mask = classify_strip(rgb[top:top + strip_rows])
+        vegetation += int(np.count_nonzero(veg_mask))
+        impervious += int(np.count_nonzero(imp_mask))
+    return LandCover(vegetation=vegetation, impervious=impervious, total=rgb.shape[0] * rgb.shape[1])
+
+
+def load_rgb(path: Path) -> np.ndarray:
+    """Decode a whole image file to an (H, W, 3) uint8 RGB array"""
+    # Pillow is only needed for offline analysis, not by the API
+    from PIL import Image
+
+    with Image.open(path) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def estimate_loss(
+    frames: Sequence[Tuple[str, Path]],
+    meters_per_pixel: float,
+    strip_rows: int = DEFAULT_STRIP_ROWS,
+) -> List[Dict[str, float]]:
+    """
+    Per-date land cover and habitat loss for chronologically ordered frames.
+
+    Loss is measured against the vegetation in the first frame: for each date
+    the cumulative loss is how much of that baseline vegetation is gone, and
+    the change is the difference from the previous date. Only one decoded
+    frame is held at a time.
+
+    meters_per_pixel applies to every frame, so all frames must have the
+    size of the first one; raises ValueError otherwise.
+    """
+    acres_per_pixel = meters_per_pixel ** 2 / SQ_METERS_PER_ACRE
+    results = []
+    baseline = None
+    previous_loss = 0.0
+    size = None
+    for date, path in frames:
+        rgb = load_rgb(path)
+        if size is None:
+            size = rgb.shape[:2]
+        elif rgb.shape[:2] != size:
+            raise ValueError(f"{path} is {rgb.shape[1]}x{rgb.shape[0]}, but the first frame is "
+                             f"{size[1]}x{size[0]}; all frames must share one ground resolution")
+        cover = classify_frame(rgb, strip_rows)
+        del rgb
+        vegetation_acres = cover.vegetation * acres_per_pixel
+        if baseline is None:
+            baseline = vegetation_acres
+        cumulative = max(0.0, baseline - vegetation_acres)
+        results.append({
+            "date": date,
+            "vegetation_acres": round(vegetation_acres, 2),
+            "impervious_acres": round(cover.impervious * acres_per_pixel, 2),
+            "habitat_loss_acres": round(cumulative, 2),
+            "habitat_loss_acres_change": round(cumulative - previous_loss, 2),
+            "habitat_loss_percentage": round(100 * cumulative / baseline, 1) if baseline else 0.0,
+        })
+        previous_loss = cumulative
+    return results
@@ -0,0 +1,97 @@
+"""
+Compound location bundles assembled from the stores' pre-encoded bodies.
+
+A bundle is a JSON object whose sections (location, species, density) are
+spliced together from bytes the stores already hold, so nothing is
+re-serialized per request. Assembled bundles are cached per data version.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from app.api.caching import make_etag
+from app.metrics import timed
+from app.services.density import DEVELOPMENT_PATTERNS
+from app.services.location_store import LocationStore, location_store
+from app.services.species_store import SpeciesStore, species_store
+
+SECTIONS = ("location", "species", "density")
+
+# Bundles kept per data version (one per location, section set and timeline mode)
+MAX_CACHED_BUNDLES = 1024
+# Species sections list every affected location, so bundles grow with the
+# catalogue; the cache is bounded in bytes as well as in entries
+MAX_CACHED_BUNDLE_BYTES = 64 * 1024 * 1024
+
+_PATTERNS_JSON = ("[" + ",".join(p.model_dump_json() for p in DEVELOPMENT_PATTERNS) + "]").encode()
+
+
+class BundleBuilder:
+    def __init__(self, locations: LocationStore = location_store, species: SpeciesStore = species_store):
+        self.locations = locations
+        self.species = species
+        self._version: Optional[tuple] = None
+        self._cache: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def bundle_json(
+        self, location_id: str, sections: FrozenSet[str], compact: bool = False
+    ) -> Optional[Tuple[bytes, str]]:
+        """Encoded LocationBundle and its ETag, or None if the location does not exist"""
+        entry = self.locations.get_entry(location_id)
+        if entry is None:
+            return None
+        # Species index first: it refreshes the location store it depends on
+        self.species.index()
+        version = (self.locations.version, self.species.version)
+        key = (location_id, sections, compact)
+
+        with self._lock:
+            if version != self._version:
+                self._cache.clear()
+                self._cached_bytes = 0
+                self._version = version
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return cached
+            self._misses += 1
+
+        with timed("serialize"):
+            body, etag = self._assemble(entry, location_id, sections, compact)
+        result = (body, etag)
+
+        with self._lock:
+            if version == self._version and key not in self._cache:
+                self._cache[key] = result
+                self._cached_bytes += len(body)
+                while len(self._cache) > MAX_CACHED_BUNDLES or self._cached_bytes > MAX_CACHED_BUNDLE_BYTES:
+                    _, (evicted, _) = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return result
+
+    def _assemble(self, entry, location_id: str, sections: FrozenSet[str], compact: bool):
+        parts = []
+        if "location" in sections:
+            body = entry.compact_json[0] if compact else entry.detail_json
+            parts.append(b'"location":' + body)
+        if "species" in sections:
+            species = self.species.location_species_json(location_id)
+            parts.append(b'"species":' + (species[0] if species is not None else b"[]"))
+        if "density" in sections:
+            density_data = json.dumps(entry.detail.density_data, separators=(",", ":")).encode()
+            parts.append(b'"density":{"density_data":' + density_data + b',"patterns":' + _PATTERNS_JSON + b"}")
+        body = b"{" + b",".join(parts) + b"}"
+        return body, make_etag(body)
+
+    def cache_stats(self) -> Dict[str, int]:
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._cache)}
+
+
+bundle_builder = BundleBuilder()
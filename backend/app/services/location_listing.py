@@ -0,0 +1,164 @@
+"""
+Sorted indexes behind the paginated location listing.
+
+For every sort key the locations are kept pre-sorted, both overall and per
+county and per ecosystem type, so a page is a bisect plus a slice no matter
+how large the catalogue is. Cursors are keyset cursors (the sort value and id
+of the last item served), so pages stay consistent while files are added or
+removed between requests.
+"""
+
+import base64
+import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+SORT_KEYS = ("id", "name", "county", "ecosystem_type")
+FILTER_FIELDS = ("county", "ecosystem_type")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def normalize(value: str) -> str:
+    """Case-insensitive form used for sorting and filtering"""
+    return value.casefold()
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last item of a page, for one sort order"""
+    sort: str
+    descending: bool
+    value: str
+    id: str
+
+    def encode(self) -> str:
+        raw = json.dumps([self.sort, self.descending, self.value, self.id], separators=(",", ":"))
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str) -> "Cursor":
+        """Raises ValueError for a token that was not produced by encode()"""
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            sort, descending, value, location_id = json.loads(raw)
+        except (ValueError, TypeError) as e:
+            raise ValueError("malformed cursor") from e
+        if sort not in SORT_KEYS or not isinstance(descending, bool) \
+                or not isinstance(value, str) or not isinstance(location_id, str):
+            raise ValueError("malformed cursor")
+        return cls(sort, descending, value, location_id)
+
+
+class SortedRun:
+    """Items in ascending (sort value, id) order with their keys, for bisecting"""
+
+    def __init__(self):
+        self.keys: Sequence[Tuple[str, str]] = []
+        self.items: Sequence[Any] = []
+
+    @classmethod
+    def from_sequences(cls, keys: Sequence[Tuple[str, str]], items: Sequence[Any]) -> "SortedRun":
+        """A run over sequences sorted elsewhere (e.g. views of the compiled catalogue)"""
+        run = cls()
+        run.keys = keys
+        run.items = items
+        return run
+
+    def append(self, key: Tuple[str, str], item: Any) -> None:
+        self.keys.append(key)
+        self.items.append(item)
+
+    def page(self, descending: bool, after: Optional[Tuple[str, str]], limit: int) -> Tuple[List[Any], bool]:
+        """Up to limit items following the key `after`, and whether more remain"""
+        if descending:
+            stop = len(self.keys) if after is None else bisect_left(self.keys, after)
+            start = max(0, stop - limit)
+            return self.items[start:stop][::-1], start > 0
+        start = 0 if after is None else bisect_right(self.keys, after)
+        stop = start + limit
+        return self.items[start:stop], stop < len(self.items)
+
+
+def sort_key(entry, key: str) -> Tuple[str, str]:
+    """Position of a location entry in the order for one sort key"""
+    return normalize(getattr(entry.summary, key)), entry.summary.id
+
+
+class ListingIndex:
+    """Immutable sorted runs over location entries, overall and per filter value"""
+
+    def __init__(self, entries: Iterable[Any]):
+        entries = list(entries)
+        self._all: Dict[str, SortedRun] = {}
+        self._filtered: Dict[Tuple[str, str], Dict[str, SortedRun]] = defaultdict(dict)
+
+        for key in SORT_KEYS:
+            run = self._all[key] = SortedRun()
+            for entry in sorted(entries, key=lambda e: sort_key(e, key)):
+                position = sort_key(entry, key)
+                run.append(position, entry)
+                for field in FILTER_FIELDS:
+                    group = self._filtered[(field, normalize(getattr(entry.summary, field)))]
+                    group.setdefault(key, SortedRun()).append(position, entry)
+        self._filtered = dict(self._filtered)
+
+    @classmethod
+    def from_runs(
+        cls, runs: Dict[str, SortedRun], filtered: Dict[Tuple[str, str], Dict[str, SortedRun]]
+    ) -> "ListingIndex":
+        """An index over runs sorted elsewhere; filtered is keyed by (field, normalized value)"""
+        index = cls(())
+        index._all = runs
+        index._filtered = filtered
+        return index
+
+    def page(
+        self,
+        sort: str = "id",
+        descending: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> Tuple[Sequence[Any], Optional[Cursor]]:
+        """One page of entries and the cursor for the next page (None on the last page)"""
+        if cursor is not None and (cursor.sort != sort or cursor.descending != descending):
+            raise ValueError("cursor was issued for a different sort order")
+
+        filters = {field: normalize(value) for field, value in (filters or {}).items()}
+        after = (cursor.value, cursor.id) if cursor is not None else None
+
+        if not filters:
+            run = self._all[sort]
+            residual = {}
+        else:
+            # Walk the smallest matching group and check any other filter per item
+            groups = []
+            for field, value in filters.items():
+                group = self._filtered.get((field, value))
+                if group is None:
+                    return [], None
+                groups.append((len(group[sort].items), field, group[sort]))
+            _, chosen, run = min(groups)
+            residual = {field: value for field, value in filters.items() if field != chosen}
+
+        # One match beyond the page tells whether a next page exists
+        wanted = limit + 1
+        entries: List[Any] = []
+        has_more = True
+        while len(entries) < wanted and has_more:
+            batch, has_more = run.page(descending, after, wanted if residual else wanted - len(entries))
+            for entry in batch:
+                after = sort_key(entry, sort)
+                if all(normalize(getattr(entry.summary, f)) == v for f, v in residual.items()):
+                    entries.append(entry)
+                    if len(entries) == wanted:
+                        break
+
+        if len(entries) <= limit:
+            return entries, None
+        entries = entries[:limit]
+        return entries, Cursor(sort, descending, *sort_key(entries[-1], sort))
@@ -0,0 +1,337 @@
+"""
+In-memory location repository.
+
+Locations come from the compiled catalogue (scripts/build_location_catalogue.py)
+when one exists, and otherwise from the JSON files in the data directory.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, Optional, Set, Tuple, Union
+
+from pydantic import ValidationError
+
+from app.api.caching import make_etag
+from app.metrics import timed
+from app.models.location import Location, LocationDetail
+from app.services.catalogue import CATALOGUE_PATH, Catalogue, CatalogueEntry
+from app.services.files import file_signature
+from app.services.location_listing import DEFAULT_PAGE_SIZE, Cursor, ListingIndex
+from app.services.location_views import TimelineViews
+from app.services.spatial_index import BoundingBox, GridIndex, cluster_points
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "locations"
+
+# How often (seconds) the data directory is re-scanned for changed files
+DEFAULT_CHECK_INTERVAL = 2.0
+
+EMPTY_LIST = (b"[]", make_etag(b"[]"))
+
+
+@dataclass
+class LocationEntry(TimelineViews):
+    """A parsed location file together with the signature it was read at"""
+    path: Path
+    signature: Tuple[int, int, int]
+    summary: Location
+    detail: LocationDetail
+    # Response bodies, encoded once per file version
+    summary_json: bytes
+    detail_json: bytes
+    detail_etag: str
+
+    @property
+    def species_ids(self) -> List[str]:
+        return self.detail.affected_species_ids
+
+
+Entry = Union[LocationEntry, CatalogueEntry]
+
+
+class LocationStore:
+    """
+    Process-wide cache of validated locations.
+
+    With a catalogue, locations and the query indexes are read from the
+    mapping, which every worker process shares, and locations are decoded on
+    first access; the file is remapped when it is replaced.
+    Without one, every JSON file is parsed once and later refreshes only stat
+    the directory and re-read the files whose inode, mtime or size changed.
+    """
+
+    def __init__(
+        self,
+        data_dir: Path = DATA_DIR,
+        check_interval: float = DEFAULT_CHECK_INTERVAL,
+        catalogue_path: Optional[Path] = CATALOGUE_PATH,
+    ):
+        self.data_dir = data_dir
+        self.catalogue_path = catalogue_path
+        self.check_interval = check_interval
+        self.version = 0
+        self._catalogue: Optional[Catalogue] = None
+        self._entries: Dict[Path, LocationEntry] = {}
+        self._by_id: Mapping[str, Entry] = {}
+        self._list_json = EMPTY_LIST
+        # Query indexes, built on first use for the current id map
+        self._indexes: Optional[Tuple[GridIndex, ListingIndex, Callable[[Any], bytes]]] = None
+        # Species id -> encoded ids of the locations listing it, without a catalogue
+        self._species_locations: Optional[Dict[str, Tuple[bytes, str]]] = None
+        self._last_check = 0.0
+        self._loaded = False
+        self._lock = threading.Lock()
+        # Refresh cache counters: files reused unchanged vs (re)parsed
+        self._hits = 0
+        self._misses = 0
+
+    def _load_file(self, path: Path, signature: Tuple[int, int, int]) -> Optional[LocationEntry]:
+        try:
+            with timed("load"):
+                with open(path, "r") as f:
+                    data = json.load(f)
+            with timed("validate"):
+                detail = LocationDetail(**data)
+        except (OSError, ValueError, ValidationError) as e:
+            print(f"Error loading {path}: {e}")
+            return None
+        with timed("serialize"):
+            summary = Location(**detail.model_dump(include=set(Location.model_fields)))
+            detail_json = detail.model_dump_json().encode()
+            summary_json = summary.model_dump_json().encode()
+        return LocationEntry(
+            path=path,
+            signature=signature,
+            summary=summary,
+            detail=detail,
+            summary_json=summary_json,
+            detail_json=detail_json,
+            detail_etag=make_etag(detail_json),
+        )
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the first load has finished"""
+        return self._loaded
+
+    def refresh(self, force: bool = False) -> bool:
+        """Reload changed, added and removed files. Returns True if anything changed."""
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return False
+
+        with self._lock:
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            try:
+                return self._reload()
+            finally:
+                # Stamped only once loading is done, so that callers arriving
+                # meanwhile wait on the lock instead of reading stale data
+                self._last_check = time.monotonic()
+                self._loaded = True
+
+    def _reload(self) -> bool:
+        if self.catalogue_path is not None:
+            signature = file_signature(self.catalogue_path)
+            if signature is not None:
+                return self._refresh_catalogue(signature)
+
+        # Falling back from a catalogue that was removed reloads every file
+        if self._catalogue is not None:
+            self._catalogue = None
+            self._entries = {}
+            changed = {self.catalogue_path}
+        else:
+            changed = set()
+
+        current = {}
+        if self.data_dir.exists():
+            for path in self.data_dir.glob("*.json"):
+                signature = file_signature(path)
+                if signature is not None:
+                    current[path] = signature
+
+        changed |= set(self._entries) - set(current)
+        entries = {p: e for p, e in self._entries.items() if p in current}
+        for path, signature in current.items():
+            existing = entries.get(path)
+            if existing is not None and existing.signature == signature:
+                self._hits += 1
+                continue
+            self._misses += 1
+            changed.add(path)
+            entry = self._load_file(path, signature)
+            if entry is None:
+                entries.pop(path, None)
+            else:
+                entries[path] = entry
+
+        if not changed:
+            return False
+
+        by_id = {}
+        for entry in sorted(entries.values(), key=lambda e: e.path.name):
+            if entry.detail.id in by_id:
+                print(f"Warning: duplicate location id '{entry.detail.id}' in {entry.path}")
+                continue
+            by_id[entry.detail.id] = entry
+
+        self._entries = entries
+        self._publish(by_id, b"[" + b",".join(e.summary_json for e in by_id.values()) + b"]")
+        return True
+
+    def _refresh_catalogue(self, signature: Tuple[int, int, int]) -> bool:
+        if self._catalogue is not None and self._catalogue.signature == signature:
+            self._hits += 1
+            return False
+        self._misses += 1
+        try:
+            with timed("load"):
+                catalogue = Catalogue(self.catalogue_path)
+        except (OSError, ValueError) as e:
+            print(f"Error loading {self.catalogue_path}: {e}")
+            return False
+        self._catalogue = catalogue
+        self._entries = {}
+        self._publish(catalogue, catalogue.list_json, catalogue.list_etag)
+        return True
+
+    def _publish(self, by_id: Mapping[str, Entry], list_json: bytes, list_etag: Optional[str] = None) -> None:
+        # Swap in complete objects so concurrent readers never see a partial update
+        self._by_id = by_id
+        self._list_json = (list_json, list_etag or make_etag(list_json))
+        self._indexes = None
+        self._species_locations = None
+        self.version += 1
+
+    def _query_indexes(self) -> Tuple[GridIndex, ListingIndex, Callable[[Any], bytes]]:
+        """Spatial and listing indexes for the current locations, and the encoded summary of a grid point key"""
+        self.refresh()
+        indexes = self._indexes
+        if indexes is None:
+            with self._lock:
+                indexes = self._indexes
+                if indexes is None:
+                    by_id = self._by_id
+                    if isinstance(by_id, Catalogue):
+                        # Precomputed by the catalogue compiler; views of the shared mapping
+                        indexes = self._indexes = (by_id.grid, by_id.listing, by_id.summary_json_at)
+                        return indexes
+                    with timed("index"):
+                        grid = GridIndex((e.summary.id, e.summary.latitude, e.summary.longitude) for e in by_id.values())
+                        indexes = self._indexes = (
+                            grid, ListingIndex(by_id.values()), lambda location_id: by_id[location_id].summary_json
+                        )
+        return indexes
+
+    def warm(self) -> None:
+        """Build the query indexes now instead of on the first map or listing request"""
+        self._query_indexes()
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Files reused vs re-read on refresh, and locations loaded"""
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._by_id)}
+
+    def list_locations(self) -> List[Location]:
+        """All locations, basic info only"""
+        self.refresh()
+        return [entry.summary for entry in self._by_id.values()]
+
+    def get_location(self, location_id: str) -> Optional[LocationDetail]:
+        """Full detail for a location, or None if it does not exist"""
+        self.refresh()
+        entry = self._by_id.get(location_id)
+        return entry.detail if entry is not None else None
+
+    def list_json(self) -> Tuple[bytes, str]:
+        """Encoded location list and its ETag"""
+        self.refresh()
+        return self._list_json
+
+    def get_entry(self, location_id: str) -> Optional[Entry]:
+        """Cached entry (models plus encoded bodies) for a location"""
+        self.refresh()
+        return self._by_id.get(location_id)
+
+    def _species_locations_json(self) -> Dict[str, Tuple[bytes, str]]:
+        """Species id -> encoded location ids, built on first use when there is no catalogue"""
+        species_locations = self._species_locations
+        if species_locations is None:
+            with self._lock:
+                species_locations = self._species_locations
+                if species_locations is None:
+                    result: Dict[str, List[str]] = defaultdict(list)
+                    for location_id, entry in self._by_id.items():
+                        for species_id in dict.fromkeys(entry.species_ids):
+                            result[species_id].append(location_id)
+                    species_locations = {}
+                    for species_id, location_ids in result.items():
+                        body = json.dumps(location_ids, separators=(",", ":"), ensure_ascii=False).encode()
+                        species_locations[species_id] = (body, make_etag(body))
+                    self._species_locations = species_locations
+        return species_locations
+
+    def listed_species(self) -> List[str]:
+        """Ids of the species listed by any location"""
+        self.refresh()
+        by_id = self._by_id
+        if isinstance(by_id, Catalogue):
+            return by_id.listed_species()
+        return list(self._species_locations_json())
+
+    def species_locations_json(self, species_id: str) -> Tuple[bytes, str]:
+        """Encoded array of the ids of the locations listing a species, and its ETag"""
+        self.refresh()
+        by_id = self._by_id
+        if isinstance(by_id, Catalogue):
+            found = by_id.species_locations_json(species_id)
+        else:
+            found = self._species_locations_json().get(species_id)
+        return found if found is not None else EMPTY_LIST
+
+    def map_view_json(self, bbox: BoundingBox, zoom: int) -> Tuple[bytes, str]:
+        """Encoded LocationMapView of the locations inside bbox, clustered for the zoom level"""
+        grid, _, summary_json = self._query_indexes()
+        with timed("query"):
+            singles, clusters = cluster_points(grid.query(bbox), zoom)
+        # Reuse the per-location encoded summaries instead of re-serializing models
+        locations = b",".join(summary_json(key) for key in singles)
+        cluster_json = ",".join(
+            json.dumps({
+                "latitude": c.latitude,
+                "longitude": c.longitude,
+                "count": len(c.ids),
+                "bbox": [c.bbox.min_lon, c.bbox.min_lat, c.bbox.max_lon, c.bbox.max_lat],
+            }, separators=(",", ":"))
+            for c in clusters
+        ).encode()
+        body = b'{"locations":[' + locations + b'],"clusters":[' + cluster_json + b"]}"
+        return body, make_etag(body)
+
+    def page_json(
+        self,
+        sort: str = "id",
+        descending: bool = False,
+        filters: Optional[Dict[str, str]] = None,
+        cursor: Optional[Cursor] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        fields: Optional[Set[str]] = None,
+    ) -> Tuple[bytes, str]:
+        """Encoded LocationPage; raises ValueError if the cursor does not fit the sort order"""
+        _, listing, _ = self._query_indexes()
+        with timed("query"):
+            entries, next_cursor = listing.page(sort, descending, filters, cursor, limit)
+        if fields is None:
+            items = b",".join(entry.summary_json for entry in entries)
+        else:
+            items = b",".join(entry.summary.model_dump_json(include=fields).encode() for entry in entries)
+        token = json.dumps(next_cursor.encode() if next_cursor else None).encode()
+        body = b'{"items":[' + items + b'],"next_cursor":' + token + b"}"
+        return body, make_etag(body)
+
+
+location_store = LocationStore()
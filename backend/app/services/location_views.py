@@ -0,0 +1,40 @@
+"""Encoded partial views of a location's detail, built once per loaded location"""
+
+from bisect import bisect_left, bisect_right
+from functools import cached_property
+from typing import List, Optional, Tuple
+
+from app.api.caching import make_etag
+from app.models.location import LocationDetailCompact
+
+
+class TimelineViews:
+    """
+    Mixin for location entries that have a `detail` model.
+
+    Provides the compact detail body and date-range slices of the time points,
+    encoded on first use and cached for as long as the entry is loaded.
+    """
+
+    @cached_property
+    def timeline(self) -> Tuple[List[str], List[bytes]]:
+        """Time point dates in chronological order, with each time point's encoded JSON"""
+        time_points = sorted(self.detail.time_points, key=lambda tp: tp.date)
+        return [tp.date for tp in time_points], [tp.model_dump_json().encode() for tp in time_points]
+
+    @cached_property
+    def compact_json(self) -> Tuple[bytes, str]:
+        """Encoded LocationDetailCompact and its ETag"""
+        compact = LocationDetailCompact(
+            **self.detail.model_dump(exclude={"time_points"}),
+            timeline=self.timeline[0],
+        )
+        body = compact.model_dump_json().encode()
+        return body, make_etag(body)
+
+    def time_points_json(self, start: Optional[str] = None, end: Optional[str] = None) -> bytes:
+        """Encoded time points dated from start to end inclusive (ISO dates; None is open-ended)"""
+        dates, encoded = self.timeline
+        lo = 0 if start is None else bisect_left(dates, start)
+        hi = len(dates) if end is None else bisect_right(dates, end)
+        return b"[" + b",".join(encoded[lo:hi]) + b"]"
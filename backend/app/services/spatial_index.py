@@ -0,0 +1,143 @@
+"""
+Uniform-grid spatial index and grid clustering for location markers.
+
+Locations are bucketed into fixed-size lat/lon cells, so a bounding-box
+query only visits the cells that overlap the box. Clustering at a given map
+zoom re-buckets the hits into cells roughly CLUSTER_RADIUS_PX wide on
+screen, so the number of markers returned is bounded by the viewport, not
+by the size of the catalogue.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+# Grid cell edge in degrees (about 28 km of latitude)
+DEFAULT_CELL_SIZE = 0.25
+
+# Markers closer than this many screen pixels are merged into a cluster
+CLUSTER_RADIUS_PX = 60
+TILE_SIZE_PX = 256
+
+# At this zoom and above every location is returned individually
+CLUSTER_MAX_ZOOM = 11
+MAX_ZOOM = 22
+
+
+@dataclass(frozen=True)
+class BoundingBox:
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+
+    @classmethod
+    def parse(cls, value: str) -> "BoundingBox":
+        """Parse "minLon,minLat,maxLon,maxLat"; raises ValueError if malformed"""
+        parts = value.split(",")
+        if len(parts) != 4:
+            raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+        min_lon, min_lat, max_lon, max_lat = (float(p) for p in parts)
+        if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+            raise ValueError("bbox values must be finite numbers")
+        if min_lon > max_lon or min_lat > max_lat:
+            raise ValueError("bbox minimums must not exceed maximums")
+        return cls(min_lon, min_lat, max_lon, max_lat)
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        return self.min_lat <= latitude <= self.max_lat and self.min_lon <= longitude <= self.max_lon
+
+
+@dataclass
+class Cluster:
+    """Locations merged into one marker"""
+    latitude: float
+    longitude: float
+    ids: List[str]
+    bbox: BoundingBox
+
+
+class GridIndex:
+    """Immutable grid over (id, latitude, longitude) points; rebuilt whenever the catalogue changes"""
+
+    def __init__(self, points: Iterable[Tuple[str, float, float]], cell_size: float = DEFAULT_CELL_SIZE):
+        self.cell_size = cell_size
+        self._cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = defaultdict(list)
+        for location_id, latitude, longitude in points:
+            self._cells[self._cell(latitude, longitude)].append((location_id, latitude, longitude))
+        self._cells = dict(self._cells)
+
+    @classmethod
+    def from_cells(cls, cells: Dict[Tuple[int, int], Sequence[Tuple[str, float, float]]], cell_size: float) -> "GridIndex":
+        """A grid over cells bucketed elsewhere (e.g. views of the compiled catalogue)"""
+        grid = cls((), cell_size)
+        grid._cells = cells
+        return grid
+
+    @property
+    def cells(self) -> Dict[Tuple[int, int], Sequence[Tuple[str, float, float]]]:
+        """Points per (column, row) cell"""
+        return self._cells
+
+    def _cell(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(longitude / self.cell_size), math.floor(latitude / self.cell_size)
+
+    def query(self, bbox: BoundingBox) -> List[Tuple[str, float, float]]:
+        """Points inside the box (edges included)"""
+        min_col, min_row = self._cell(bbox.min_lat, bbox.min_lon)
+        max_col, max_row = self._cell(bbox.max_lat, bbox.max_lon)
+
+        # A box wider than the populated area would visit mostly empty cells
+        if (max_col - min_col + 1) * (max_row - min_row + 1) > len(self._cells):
+            cells = (
+                points for (col, row), points in self._cells.items()
+                if min_col <= col <= max_col and min_row <= row <= max_row
+            )
+        else:
+            cells = (
+                self._cells.get((col, row), ())
+                for col in range(min_col, max_col + 1)
+                for row in range(min_row, max_row + 1)
+            )
+
+        return [point for points in cells for point in points if bbox.contains(point[1], point[2])]
+
+
+def cluster_cell_size(zoom: int) -> float:
+    """Width in degrees of CLUSTER_RADIUS_PX at a Web Mercator zoom level"""
+    return 360.0 / (2 ** zoom) * CLUSTER_RADIUS_PX / TILE_SIZE_PX
+
+
+def cluster_points(points: List[Tuple[str, float, float]], zoom: int) -> Tuple[List[str], List[Cluster]]:
+    """
+    Split points into single location ids and clusters for a zoom level.
+
+    Below CLUSTER_MAX_ZOOM points sharing a screen-space grid cell are merged
+    into a cluster positioned at their centroid; a cell holding one point
+    stays a single location.
+    """
+    if zoom >= CLUSTER_MAX_ZOOM:
+        return [location_id for location_id, _, _ in points], []
+
+    size = cluster_cell_size(zoom)
+    cells: Dict[Tuple[int, int], List[Tuple[str, float, float]]] = defaultdict(list)
+    for point in points:
+        cells[(math.floor(point[2] / size), math.floor(point[1] / size))].append(point)
+
+    singles = []
+    clusters = []
+    for key in sorted(cells):
+        members = cells[key]
+        if len(members) == 1:
+            singles.append(members[0][0])
+            continue
+        latitudes = [lat for _, lat, _ in members]
+        longitudes = [lon for _, _, lon in members]
+        clusters.append(Cluster(
+            latitude=sum(latitudes) / len(members),
+            longitude=sum(longitudes) / len(members),
+            ids=[location_id for location_id, _, _ in members],
+            bbox=BoundingBox(min(longitudes), min(latitudes), max(longitudes), max(latitudes)),
+        ))
+    return singles, clusters
@@ -0,0 +1,149 @@
+"""In-memory species repository with a location <-> species inverted index"""
+
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pydantic import ValidationError
+
+from app.api.caching import make_etag
+from app.metrics import timed
+from app.models.species import Species
+from app.services.files import file_signature
+from app.services.location_store import LocationStore, location_store
+
+SPECIES_PATH = Path(__file__).resolve().parent.parent / "data" / "species.json"
+
+
+@dataclass
+class SpeciesIndex:
+    """Species and their encoded bodies, without affected_locations, for one version of the species file"""
+    by_id: Dict[str, Species]
+    species_json: Dict[str, Tuple[bytes, str]]
+
+
+class SpeciesStore:
+    """
+    Species loaded once from app/data/species.json.
+
+    affected_locations is derived from the locations' affected_species_ids.
+    It grows with the location catalogue, so it is not held here: each
+    response splices the encoded array the location store keeps for the
+    species (in the shared catalogue mapping, when there is one) into the
+    species body encoded without it.
+    """
+
+    def __init__(self, path: Path = SPECIES_PATH, locations: LocationStore = location_store):
+        self.path = path
+        self.locations = locations
+        self.version = 0
+        self._key: Optional[tuple] = None
+        self._index: Optional[SpeciesIndex] = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _load_species(self) -> List[Species]:
+        try:
+            with timed("load"):
+                with open(self.path, "r") as f:
+                    data = json.load(f)
+            with timed("validate"):
+                return [Species(**item) for item in data]
+        except (OSError, ValueError, ValidationError) as e:
+            print(f"Error loading {self.path}: {e}")
+            return []
+
+    def _build(self) -> SpeciesIndex:
+        by_id = {}
+        for species in self._load_species():
+            if species.id in by_id:
+                print(f"Warning: duplicate species id '{species.id}' in {self.path}")
+                continue
+            by_id[species.id] = species
+
+        for species_id in self.locations.listed_species():
+            if species_id not in by_id:
+                print(f"Warning: locations list unknown species '{species_id}'")
+
+        species_json = {}
+        for species_id, species in by_id.items():
+            # affected_locations is the last field, so it is appended in _species_body()
+            body = species.model_dump_json(exclude={"affected_locations"}).encode()
+            species_json[species_id] = (body, make_etag(body))
+        return SpeciesIndex(by_id=by_id, species_json=species_json)
+
+    def _species_body(self, index: SpeciesIndex, species_id: str) -> Tuple[bytes, str]:
+        body, etag = index.species_json[species_id]
+        locations, locations_etag = self.locations.species_locations_json(species_id)
+        return (
+            b"".join((body[:-1], b',"affected_locations":', locations, b"}")),
+            make_etag(f"{etag},{locations_etag}".encode()),
+        )
+
+    def _species_list(self, index: SpeciesIndex, species_ids: Iterable[str]) -> Tuple[bytes, str]:
+        # Every species body lists all of its locations, so the list can be
+        # megabytes on a large catalogue: derive the ETag from the parts'
+        # ETags rather than hashing (or caching) the body
+        parts = [self._species_body(index, species_id) for species_id in species_ids if species_id in index.by_id]
+        body = b"[" + b",".join(body for body, _ in parts) + b"]"
+        return body, make_etag(",".join(etag for _, etag in parts).encode())
+
+    @property
+    def loaded(self) -> bool:
+        """Whether an index has been built"""
+        return self._index is not None
+
+    def index(self) -> SpeciesIndex:
+        """Current index, rebuilt if the species file or the locations changed"""
+        self.locations.refresh()
+        key = (file_signature(self.path), self.locations.version)
+        if key != self._key:
+            with self._lock:
+                if key != self._key:
+                    self._misses += 1
+                    with timed("index"):
+                        self._index = self._build()
+                    self._key = key
+                    self.version += 1
+                    return self._index
+        self._hits += 1
+        return self._index
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Index reuses vs rebuilds, and species loaded"""
+        return {"hits": self._hits, "misses": self._misses, "size": len(self._index.by_id) if self._index else 0}
+
+    def list_json(self) -> Tuple[bytes, str]:
+        """Encoded species list and its ETag"""
+        index = self.index()
+        return self._species_list(index, index.by_id)
+
+    def species_json(self, species_id: str) -> Optional[Tuple[bytes, str]]:
+        """Encoded species and its ETag, or None if it does not exist"""
+        index = self.index()
+        if species_id not in index.by_id:
+            return None
+        return self._species_body(index, species_id)
+
+    def location_species_json(self, location_id: str) -> Optional[Tuple[bytes, str]]:
+        """Encoded list of the species affected at a location, or None if the location does not exist"""
+        index = self.index()
+        entry = self.locations.get_entry(location_id)
+        if entry is None:
+            return None
+        # Read from the catalogue's location -> species table, not the encoded detail
+        return self._species_list(index, entry.species_ids)
+
+    def get_species(self, species_id: str) -> Optional[Species]:
+        index = self.index()
+        species = index.by_id.get(species_id)
+        if species is None:
+            return None
+        locations, _ = self.locations.species_locations_json(species_id)
+        return species.model_copy(update={"affected_locations": json.loads(bytes(locations))})
+
+
+species_store = SpeciesStore()
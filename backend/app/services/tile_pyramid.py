@@ -0,0 +1,200 @@
+"""
+Deep-zoom tile pyramids for timeline frames.
+
+Each frame is stored as a single .dftp file:
+
+    header   magic b"DFTP", format version (u16), reserved (u16), metadata length (u32)
+    metadata UTF-8 JSON: size, tile size, zoom levels and tile format
+    index    one (offset u64, length u32) entry per tile, level by level, row-major
+    tiles    encoded tile images, back to back
+
+Level 0 fits the whole frame in a single tile; each following level doubles
+the resolution up to max_zoom, which is the full-resolution frame. Edge tiles
+are cropped rather than padded.
+"""
+
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.services.files import file_signature
+
+TILES_DIR = Path(__file__).resolve().parent.parent / "data" / "tiles"
+
+MAGIC = b"DFTP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHI")
+INDEX_ENTRY = struct.Struct("<QI")
+
+DEFAULT_TILE_SIZE = 256
+MEDIA_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg", "png": "image/png"}
+
+
+def pyramid_path(location_id: str, date: str, tiles_dir: Path = TILES_DIR) -> Path:
+    """Where the pyramid for one time point is stored"""
+    return tiles_dir / location_id / f"{date}.dftp"
+
+
+def level_sizes(width: int, height: int, tile_size: int) -> List[Tuple[int, int]]:
+    """(width, height) of every zoom level, from level 0 up to full resolution"""
+    max_zoom = max(0, math.ceil(math.log2(max(width, height) / tile_size)))
+    sizes = [(width, height)]
+    for _ in range(max_zoom):
+        w, h = sizes[-1]
+        sizes.append((max(1, math.ceil(w / 2)), max(1, math.ceil(h / 2))))
+    return sizes[::-1]
+
+
+class TilePyramid:
+    """
+    Read-only view of a .dftp file; only the header and index are kept in memory.
+
+    The file stays open so tiles are always read from the same file the index
+    came from, even if a rebuild replaces it on disk.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            magic, version, _, meta_length = HEADER.unpack(self._file.read(HEADER.size))
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError(f"{path} is not a version {FORMAT_VERSION} tile pyramid")
+            self.meta = json.loads(self._file.read(meta_length))
+            self._level_starts = []
+            count = 0
+            for level in self.meta["levels"]:
+                self._level_starts.append(count)
+                count += level["cols"] * level["rows"]
+            self._index = self._file.read(count * INDEX_ENTRY.size)
+        except Exception:
+            self._file.close()
+            raise
+
+    @property
+    def media_type(self) -> str:
+        return MEDIA_TYPES[self.meta["format"]]
+
+    def tile(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Encoded tile bytes, or None if (z, x, y) is outside the pyramid"""
+        levels = self.meta["levels"]
+        if not 0 <= z < len(levels):
+            return None
+        level = levels[z]
+        if not (0 <= x < level["cols"] and 0 <= y < level["rows"]):
+            return None
+        entry = self._level_starts[z] + y * level["cols"] + x
+        offset, length = INDEX_ENTRY.unpack_from(self._index, entry * INDEX_ENTRY.size)
+        return os.pread(self._file.fileno(), length, offset)
+
+
+class TileStore:
+    """Caches opened pyramids, reopening a file when it changes on disk"""
+
+    def __init__(self, tiles_dir: Path = TILES_DIR):
+        self.tiles_dir = tiles_dir
+        self._pyramids: Dict[Path, Tuple[Tuple[int, int, int], TilePyramid]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, location_id: str, date: str) -> Optional[TilePyramid]:
+        path = pyramid_path(location_id, date, self.tiles_dir)
+        signature = file_signature(path)
+        if signature is None:
+            return None
+        cached = self._pyramids.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        with self._lock:
+            try:
+                pyramid = TilePyramid(path)
+            except (OSError, ValueError) as e:
+                print(f"Error loading {path}: {e}")
+                return None
+            self._pyramids[path] = (signature, pyramid)
+            return pyramid
+
+
+tile_store = TileStore()
+
+
+def build_pyramid(
+    image_path: Path,
+    output_path: Path,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    tile_format: str = "webp",
+    quality: int = 80,
+) -> dict:
+    """
+    Cut an image into a tile pyramid and write it to output_path.
+
+    Returns the pyramid metadata plus a content hash ("version") that callers
+    can put in tile URLs so the tiles can be cached forever.
+    """
+    # Pillow is only needed to build pyramids, not to serve them
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        img.load()
+        frame = img.convert("RGB")
+
+    sizes = level_sizes(frame.width, frame.height, tile_size)
+    levels = [
+        {"width": w, "height": h, "cols": math.ceil(w / tile_size), "rows": math.ceil(h / tile_size)}
+        for w, h in sizes
+    ]
+
+    # Halve successively from full resolution down to level 0
+    images = {}
+    current = frame
+    for z in range(len(sizes) - 1, -1, -1):
+        if current.size != sizes[z]:
+            current = current.resize(sizes[z], Image.LANCZOS)
+        images[z] = current
+
+    save_format = {"webp": "WEBP", "jpeg": "JPEG", "png": "PNG"}[tile_format]
+    tiles = []
+    for z, level in enumerate(levels):
+        for y in range(level["rows"]):
+            for x in range(level["cols"]):
+                box = (x * tile_size, y * tile_size,
+                       min((x + 1) * tile_size, level["width"]), min((y + 1) * tile_size, level["height"]))
+                buffer = io.BytesIO()
+                images[z].crop(box).save(buffer, save_format, quality=quality)
+                tiles.append(buffer.getvalue())
+
+    meta = {
+        "width": frame.width,
+        "height": frame.height,
+        "tile_size": tile_size,
+        "max_zoom": len(levels) - 1,
+        "format": tile_format,
+        "levels": levels,
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+    offset = HEADER.size + len(meta_bytes) + INDEX_ENTRY.size * len(tiles)
+
+    index = bytearray()
+    digest = hashlib.sha256(meta_bytes)
+    for data in tiles:
+        index += INDEX_ENTRY.pack(offset, len(data))
+        offset += len(data)
+        digest.update(data)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(meta_bytes)))
+        f.write(meta_bytes)
+        f.write(index)
+        for data in tiles:
+            f.write(data)
+    # Atomic swap so the server never reads a half-written pyramid
+    os.replace(tmp_path, output_path)
+
+    return {**meta, "version": digest.hexdigest()[:16]}
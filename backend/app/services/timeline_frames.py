@@ -0,0 +1,31 @@
+"""Locating the source image files behind a location's timeline"""
+
+from pathlib import Path
+from typing import Optional
+
+RESPONSIVE_SUFFIXES = ('mobile', 'tablet', 'desktop')
+
+
+def find_frame(image_dir: Path, image_url: str, date: str, responsive_fallback: bool = True) -> Optional[Path]:
+    """
+    Source frame for a time point in image_dir.
+
+    Prefers the file named like the time point's image_url, then any PNG with
+    the date in its name, skipping responsive variants. Timelines that only
+    ship responsive variants fall back to the desktop (1920w) WebP, unless
+    responsive_fallback is False: that variant is downscaled, so it must not
+    be mixed with full-resolution frames where pixel sizes matter.
+    """
+    by_name = image_dir / Path(image_url).name
+    if by_name.exists():
+        return by_name
+    candidates = sorted(
+        p for p in image_dir.glob(f"*{date}*.png")
+        if not any(suffix in p.name for suffix in RESPONSIVE_SUFFIXES)
+    )
+    if candidates:
+        return candidates[0]
+    if not responsive_fallback:
+        return None
+    desktop = image_dir / f"{Path(image_url).stem}-desktop.webp"
+    return desktop if desktop.exists() else None
@@ -0,0 +1,94 @@
+"""
+Startup timing and background warm-up of the data stores.
+
+The app is importable without touching the data or importing NumPy, so a
+new worker accepts connections (and answers /health) right away. The
+lifespan hook then loads the location catalogue and builds the query and
+species indexes in a worker thread. Data routes depend on data_ready(), so
+a request that arrives before the stores are loaded waits for them in a
+worker thread too, rather than blocking the event loop or being answered
+from an empty store.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StartupTimer:
+    """Durations of the startup steps, from when this module was imported"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps: Dict[str, float] = {}
+        self.ready = False
+        self._mark = self.started
+
+    def mark(self, step: str) -> None:
+        """Record the time since the previous mark under a step name"""
+        now = time.perf_counter()
+        self.steps[step] = now - self._mark
+        self._mark = now
+
+    @contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def summary(self) -> str:
+        return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in self.steps.items())
+
+    def report(self) -> Dict[str, object]:
+        return {"ready": self.ready, "steps_ms": {name: round(s * 1000, 1) for name, s in self.steps.items()}}
+
+
+startup = StartupTimer()
+
+
+def warm_up_steps() -> List[Tuple[str, Callable[[], object]]]:
+    """(name, function) for each store to load ahead of the first request, in order"""
+    from app.services.location_store import location_store
+    from app.services.species_store import species_store
+
+    return [
+        ("locations", lambda: location_store.refresh(force=True)),
+        ("location indexes", location_store.warm),
+        ("species", species_store.index),
+    ]
+
+
+def _warm_up(steps: List[Tuple[str, Callable[[], object]]]) -> None:
+    for name, warm in steps:
+        try:
+            with startup.step(name):
+                warm()
+        except Exception as e:
+            print(f"Error warming {name}: {e}")
+
+
+async def warm_up(steps: Optional[List[Tuple[str, Callable[[], object]]]] = None) -> None:
+    """Run the warm-up steps in a worker thread so the event loop keeps serving"""
+    started = time.perf_counter()
+    await asyncio.to_thread(_warm_up, steps if steps is not None else warm_up_steps())
+    startup.ready = True
+    print(f"Warm-up finished in {(time.perf_counter() - started) * 1000:.0f}ms ({startup.summary()})")
+
+
+def _load_data() -> None:
+    from app.services.species_store import species_store
+
+    # Refreshes the locations first; both block until a load in progress finishes
+    species_store.index()
+
+
+async def data_ready() -> None:
+    """Route dependency: wait off the event loop until the data stores have been loaded once"""
+    from app.services.location_store import location_store
+    from app.services.species_store import species_store
+
+    if not (location_store.loaded and species_store.loaded):
+        await asyncio.to_thread(_load_data)
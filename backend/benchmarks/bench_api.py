@@ -0,0 +1,124 @@
+"""
+API benchmarks: drive the FastAPI app in-process against synthetic catalogues.
+
+Requests go through httpx's ASGI transport, so the whole middleware stack
+(metrics, gzip, caching headers) is exercised without sockets or a server.
+For each catalogue size the location store is pointed at a freshly compiled
+synthetic catalogue; the cost of loading it and the first (cold) request of
+each route are reported separately from the steady-state latencies.
+"""
+
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from harness import measure_async
+from synthetic import SPECIES_IDS, location_id, write_synthetic_catalogue
+
+from app.main import app
+from app.services.density import DEVELOPMENT_PATTERNS
+from app.services.location_store import location_store
+
+DEFAULT_SIZES = [10, 1_000, 100_000]
+
+# A viewport over central Florida, at a zoom where clustering is active
+MAP_VIEWPORT = "bbox=-82.6,27.4,-80.9,29.1&zoom=8"
+
+Request = Tuple[str, str, Any]  # method, path, JSON body
+
+
+def scenarios(count: int) -> Dict[str, Callable[[int], Request]]:
+    """Name -> function building the i-th request for a catalogue of `count` locations"""
+    rng = random.Random(count)
+    ids = [location_id(rng.randrange(count)) for _ in range(4096)]
+    patterns = [pattern.model_dump() for pattern in DEVELOPMENT_PATTERNS]
+
+    def density(i: int) -> Request:
+        # A few hundred distinct inputs: a realistic mix of cache hits and misses
+        return "POST", "/api/density/calculate", {
+            "population": 1000 + (i % 400) * 250,
+            "people_per_unit": 2.5,
+            "pattern": patterns[i % len(patterns)],
+        }
+
+    return {
+        "locations.list": lambda i: ("GET", "/api/locations/", None),
+        "locations.page": lambda i: ("GET", "/api/locations/?limit=50&sort=name", None),
+        "locations.map": lambda i: ("GET", f"/api/locations/?{MAP_VIEWPORT}", None),
+        "locations.detail": lambda i: ("GET", f"/api/locations/{ids[i % len(ids)]}", None),
+        "locations.bundle": lambda i: ("GET", f"/api/locations/{ids[i % len(ids)]}/bundle", None),
+        "density.calculate": density,
+        "species.list": lambda i: ("GET", "/api/species/", None),
+        "species.detail": lambda i: ("GET", f"/api/species/{SPECIES_IDS[i % len(SPECIES_IDS)]}", None),
+        "species.location": lambda i: ("GET", f"/api/species/location/{ids[i % len(ids)]}", None),
+    }
+
+
+def load_catalogue(directory: Path, count: int, time_points: int) -> Dict[str, float]:
+    """Compile a synthetic catalogue and make the global location store serve it"""
+    catalogue = directory / f"locations-{count}.dflc"
+    t0 = time.perf_counter()
+    write_synthetic_catalogue(catalogue, count, time_points)
+    built = time.perf_counter() - t0
+
+    location_store.catalogue_path = catalogue
+    location_store.data_dir = directory / "no-json-files"
+    t0 = time.perf_counter()
+    location_store.refresh(force=True)
+    loaded = time.perf_counter() - t0
+    return {
+        "catalogue_bytes": catalogue.stat().st_size,
+        "build_seconds": round(built, 4),
+        "load_seconds": round(loaded, 4),
+    }
+
+
+async def run_size(count: int, iterations: int, concurrency: int, max_seconds: float,
+                   time_points: int, directory: Path, only: List[str]) -> Dict[str, Any]:
+    import httpx
+
+    result: Dict[str, Any] = {"locations": count, **load_catalogue(directory, count, time_points)}
+    routes = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, build in scenarios(count).items():
+            if only and not any(name.startswith(prefix) for prefix in only):
+                continue
+
+            async def call(i: int, build=build) -> None:
+                method, path, body = build(i)
+                response = await client.request(method, path, json=body)
+                if response.status_code != 200:
+                    raise RuntimeError(f"{method} {path} returned {response.status_code}")
+
+            t0 = time.perf_counter()
+            await call(0)
+            cold_ms = round((time.perf_counter() - t0) * 1000, 4)
+            stats = await measure_async(call, iterations, concurrency, warmup=0, max_seconds=max_seconds)
+            method, path, _ = build(0)
+            routes[name] = {"method": method, "path": path, "cold_ms": cold_ms, **stats}
+            print(f"  ✓ {count:>7,} {name:<20} p50 {stats['p50_ms']:8.3f} ms  "
+                  f"p99 {stats['p99_ms']:8.3f} ms  {stats['ops_per_second']:9.1f} req/s")
+    result["routes"] = routes
+    return result
+
+
+def run(sizes: List[int], iterations: int, concurrency: int, max_seconds: float,
+        time_points: int = 12, only: List[str] = ()) -> List[Dict[str, Any]]:
+    """Benchmark every scenario against a catalogue of each size, smallest first"""
+    saved = (location_store.catalogue_path, location_store.data_dir)
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="df-bench-") as tmp:
+            for count in sorted(sizes):
+                print(f"API: {count:,} locations")
+                results.append(asyncio.run(run_size(
+                    count, iterations, concurrency, max_seconds, time_points, Path(tmp), list(only)
+                )))
+    finally:
+        location_store.catalogue_path, location_store.data_dir = saved
+        location_store.refresh(force=True)
+    return results
@@ -0,0 +1,77 @@
+"""
+Imagery benchmarks: the colour normalization and responsive-image steps of the
+timeline pipeline, timed on synthetic frames of several sizes.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from harness import BACKEND_DIR, REPO_DIR, measure
+from synthetic import make_frame
+
+NORMALIZER_DIR = REPO_DIR / "frontend" / "public" / "images" / "timelines"
+SCRIPTS_DIR = BACKEND_DIR / "scripts"
+
+DEFAULT_SIZES = [(640, 480), (1920, 1080), (4096, 3072)]
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    """Parse WIDTHxHEIGHT"""
+    width, _, height = value.lower().partition("x")
+    return int(width), int(height)
+
+
+def load_tools():
+    """Import the normalizer and the responsive-image script from their directories"""
+    for directory in (NORMALIZER_DIR, SCRIPTS_DIR):
+        if str(directory) not in sys.path:
+            sys.path.insert(0, str(directory))
+    import create_responsive_images
+    import normalize_satellite_colors
+    return normalize_satellite_colors, create_responsive_images
+
+
+def cases(width: int, height: int, directory: Path) -> Dict[str, Callable[[int], Any]]:
+    """Name -> callable timing one operation on frames of this size"""
+    import cv2
+
+    normalizer, responsive = load_tools()
+
+    frame = make_frame(width, height, seed=1)
+    reference = make_frame(width, height, seed=2, tint=(0.9, 1.1, 1.05))
+    ref_mean, ref_std = normalizer.calculate_reference_stats([reference])
+    profile = normalizer.ReferenceProfile.from_image(reference)
+
+    source = directory / f"frame-{width}x{height}.png"
+    cv2.imwrite(str(source), frame)
+    settings = responsive.EncodeSettings(force=True)
+
+    return {
+        "normalize_mean_std": lambda i: normalizer.normalize_mean_std(frame, ref_mean, ref_std),
+        "histogram_matching": lambda i: normalizer.histogram_matching(frame, reference),
+        "histogram_matching.profile": lambda i: normalizer.histogram_matching(frame, profile),
+        "apply_clahe": lambda i: normalizer.apply_clahe(frame),
+        "responsive_images": lambda i: responsive.create_variants(source, settings),
+    }
+
+
+def run(sizes: List[Tuple[int, int]], iterations: int, max_seconds: float,
+        only: List[str] = ()) -> List[Dict[str, Any]]:
+    """Time every operation on one synthetic frame per size"""
+    results = []
+    with tempfile.TemporaryDirectory(prefix="df-bench-") as tmp:
+        for width, height in sizes:
+            print(f"Imagery: {width}x{height}")
+            operations = {}
+            for name, fn in cases(width, height, Path(tmp)).items():
+                if only and not any(name.startswith(prefix) for prefix in only):
+                    continue
+                stats = measure(fn, iterations, warmup=1, max_seconds=max_seconds)
+                operations[name] = stats
+                print(f"  ✓ {width}x{height} {name:<28} p50 {stats['p50_ms']:9.2f} ms  "
+                      f"p99 {stats['p99_ms']:9.2f} ms")
+            results.append({"width": width, "height": height, "megapixels": round(width * height / 1e6, 3),
+                            "operations": operations})
+    return results
@@ -0,0 +1,100 @@
+"""Timing helpers and run metadata shared by the benchmark suites"""
+
+import asyncio
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_DIR = BACKEND_DIR.parent
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(fraction * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[float], elapsed: float) -> Dict[str, float]:
+    """Latency percentiles (ms) and throughput for a list of per-call durations (s)"""
+    ordered = sorted(samples)
+    return {
+        "count": len(samples),
+        "ops_per_second": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 4) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p90_ms": round(percentile(ordered, 0.90) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "min_ms": round(ordered[0] * 1000, 4) if ordered else 0.0,
+        "max_ms": round(ordered[-1] * 1000, 4) if ordered else 0.0,
+    }
+
+
+def measure(fn: Callable[[int], Any], iterations: int, warmup: int = 1, max_seconds: float = 30.0) -> Dict[str, float]:
+    """Call fn(i) up to `iterations` times (stopping after max_seconds) and summarize"""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    start = time.perf_counter()
+    for i in range(iterations):
+        t0 = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - t0)
+        if time.perf_counter() - start > max_seconds:
+            break
+    return summarize(samples, time.perf_counter() - start)
+
+
+async def measure_async(
+    fn: Callable[[int], Awaitable[Any]],
+    iterations: int,
+    concurrency: int = 1,
+    warmup: int = 5,
+    max_seconds: float = 30.0,
+) -> Dict[str, float]:
+    """Run fn(i) `iterations` times across `concurrency` workers and summarize"""
+    for i in range(warmup):
+        await fn(i)
+    samples: List[float] = []
+    counter = iter(range(iterations))
+    start = time.perf_counter()
+
+    async def worker():
+        for i in counter:
+            if time.perf_counter() - start > max_seconds:
+                return
+            t0 = time.perf_counter()
+            await fn(i)
+            samples.append(time.perf_counter() - t0)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(samples, time.perf_counter() - start)
+
+
+def run_metadata(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """Where and on what code a run happened, so results can be compared across commits"""
+    def git(*args: str) -> str:
+        try:
+            return subprocess.run(
+                ["git", *args], cwd=REPO_DIR, capture_output=True, text=True, timeout=10
+            ).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ""
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git("rev-parse", "HEAD"),
+        "git_dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "arguments": arguments,
+    }
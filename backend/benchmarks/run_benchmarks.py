@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmarks for the API and the imagery tooling.
+
+The API suite drives the FastAPI app in-process against synthetic catalogues
+(10, 1,000 and 100,000 locations by default) and reports throughput and
+p50/p90/p99 latency per route. The imagery suite times colour normalization
+and responsive-image generation on synthetic frames of several sizes. Inputs
+are generated from fixed seeds, and results are written as JSON together
+with the git commit they were measured on, so runs can be compared across
+commits with --compare.
+
+Usage:
+    python benchmarks/run_benchmarks.py [--suite api|imagery|all] [--sizes N ...]
+        [--frame-sizes WxH ...] [--output results.json] [--compare baseline.json]
+
+Example:
+    python benchmarks/run_benchmarks.py --suite api --sizes 10 1000 -o before.json
+    python benchmarks/run_benchmarks.py --suite api --sizes 10 1000 --compare before.json
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from harness import run_metadata  # noqa: E402
+
+
+def flatten(results: dict) -> Dict[str, float]:
+    """Benchmark name -> p50 latency (ms) for every measurement in a results file"""
+    p50 = {}
+    for size in results.get("api", []):
+        for route, stats in size["routes"].items():
+            p50[f"api/{size['locations']}/{route}"] = stats["p50_ms"]
+    for frame in results.get("imagery", []):
+        for operation, stats in frame["operations"].items():
+            p50[f"imagery/{frame['width']}x{frame['height']}/{operation}"] = stats["p50_ms"]
+    return p50
+
+
+def compare(baseline: dict, current: dict) -> None:
+    """Print the p50 change of every benchmark present in both runs"""
+    before = flatten(baseline)
+    after = flatten(current)
+    common = [name for name in after if name in before]
+    if not common:
+        print("\nNo benchmarks in common with the baseline")
+        return
+    print(f"\np50 vs baseline {baseline['meta'].get('git_commit', '')[:12]}:")
+    for name in common:
+        change = (after[name] - before[name]) / before[name] * 100 if before[name] else 0.0
+        print(f"  {name:<55} {before[name]:10.3f} -> {after[name]:10.3f} ms  ({change:+6.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the API and imagery tooling on synthetic data'
+    )
+    parser.add_argument(
+        '--suite',
+        choices=['api', 'imagery', 'all'],
+        default='all',
+        help='Which benchmarks to run (default: all)'
+    )
+    parser.add_argument(
+        '--sizes',
+        type=int,
+        nargs='+',
+        default=None,
+        help='Synthetic catalogue sizes for the API suite (default: 10 1000 100000)'
+    )
+    parser.add_argument(
+        '--time-points',
+        type=int,
+        default=12,
+        help='Time points per synthetic location (default: 12)'
+    )
+    parser.add_argument(
+        '--requests', '-n',
+        type=int,
+        default=500,
+        help='Requests per API route and catalogue size (default: 500)'
+    )
+    parser.add_argument(
+        '--concurrency', '-c',
+        type=int,
+        default=1,
+        help='Concurrent in-flight API requests (default: 1)'
+    )
+    parser.add_argument(
+        '--frame-sizes',
+        type=str,
+        nargs='+',
+        default=None,
+        help='Frame sizes for the imagery suite as WIDTHxHEIGHT (default: 640x480 1920x1080 4096x3072)'
+    )
+    parser.add_argument(
+        '--repeat', '-r',
+        type=int,
+        default=5,
+        help='Repetitions per imagery operation and frame size (default: 5)'
+    )
+    parser.add_argument(
+        '--max-seconds',
+        type=float,
+        default=20.0,
+        help='Stop measuring a single benchmark after this long (default: 20)'
+    )
+    parser.add_argument(
+        '--only',
+        type=str,
+        nargs='+',
+        default=[],
+        help='Only run benchmarks whose name starts with one of these prefixes, e.g. locations. apply_clahe'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default=None,
+        help='Write the JSON results here instead of stdout'
+    )
+    parser.add_argument(
+        '--compare',
+        type=str,
+        default=None,
+        help='Results file from an earlier run to compare p50 latencies against'
+    )
+
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        try:
+            with open(args.compare) as f:
+                baseline = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Error: cannot read baseline '{args.compare}': {e}", file=sys.stderr)
+            sys.exit(1)
+
+    results = {"meta": run_metadata(vars(args))}
+
+    if args.suite in ('api', 'all'):
+        import bench_api
+        results["api"] = bench_api.run(
+            args.sizes or bench_api.DEFAULT_SIZES,
+            args.requests,
+            max(1, args.concurrency),
+            args.max_seconds,
+            time_points=args.time_points,
+            only=args.only,
+        )
+
+    if args.suite in ('imagery', 'all'):
+        try:
+            import bench_imagery
+            frame_sizes = [bench_imagery.parse_size(s) for s in args.frame_sizes] \
+                if args.frame_sizes else bench_imagery.DEFAULT_SIZES
+        except ImportError as e:
+            print(f"Error: imagery benchmarks need numpy, opencv-python and Pillow ({e})", file=sys.stderr)
+            sys.exit(1)
+        except ValueError:
+            print("Error: --frame-sizes must look like 1920x1080", file=sys.stderr)
+            sys.exit(1)
+        results["imagery"] = bench_imagery.run(frame_sizes, args.repeat, args.max_seconds, only=args.only)
+
+    body = json.dumps(results, indent=2)
+    if args.output:
+        Path(args.output).write_text(body + "\n")
+        print(f"\n✓ Wrote results to {args.output}")
+    else:
+        print(body)
+
+    if baseline is not None:
+        compare(baseline, results)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Deterministic synthetic data for the benchmarks: location catalogues and satellite-like frames"""
+
+import random
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterator
+
+from app.models.location import LocationDetail, TimePoint
+from app.services.catalogue import write_catalogue
+
+COUNTIES = [
+    "Alachua", "Brevard", "Broward", "Collier", "Duval", "Hillsborough", "Lake", "Lee",
+    "Leon", "Marion", "Miami-Dade", "Orange", "Osceola", "Palm Beach", "Pasco", "Pinellas",
+    "Polk", "Sarasota", "Seminole", "St. Johns", "Volusia",
+]
+ECOSYSTEMS = [
+    "Scrub", "Pine Flatwoods", "Sandhill", "Hardwood Hammock", "Freshwater Marsh",
+    "Cypress Swamp", "Mangrove", "Coastal Dune", "Wet Prairie",
+]
+SPECIES_IDS = [
+    "gopher-tortoise", "florida-scrub-jay", "monarch-butterfly", "bald-eagle",
+    "american-alligator", "painted-bunting", "sandhill-crane",
+]
+
+# Rough extent of peninsular Florida
+LATITUDE_RANGE = (24.5, 31.0)
+LONGITUDE_RANGE = (-87.6, -80.0)
+
+
+def location_id(index: int) -> str:
+    return f"synthetic-{index:06d}"
+
+
+def make_location(index: int, rng: random.Random, time_points: int) -> LocationDetail:
+    """One location shaped like the hand-written files in app/data/locations"""
+    location = location_id(index)
+    directory = f"/static/images/timelines/{location}"
+    day = date(2000, 1, 1) + timedelta(days=rng.randrange(365))
+    points = []
+    for _ in range(time_points):
+        day += timedelta(days=rng.randrange(180, 900))
+        stem = f"{directory}/{day.isoformat()}-{location}"
+        points.append(TimePoint(
+            year=day.year,
+            date=day.isoformat(),
+            image_url=f"{stem}.png",
+            image_url_mobile=f"{stem}-mobile.webp",
+            image_url_tablet=f"{stem}-tablet.webp",
+            image_url_desktop=f"{stem}-desktop.webp",
+            description=f"Development in progress - {day.isoformat()}",
+        ))
+    return LocationDetail(
+        id=location,
+        name=f"Synthetic Site {index}",
+        county=rng.choice(COUNTIES),
+        ecosystem_type=rng.choice(ECOSYSTEMS),
+        latitude=round(rng.uniform(*LATITUDE_RANGE), 6),
+        longitude=round(rng.uniform(*LONGITUDE_RANGE), 6),
+        thumbnail_url=points[0].image_url if points else None,
+        description_short="Development site in Florida showing habitat transformation.",
+        description_full="This area shows the transformation of natural ecosystems into suburban development.",
+        time_points=points,
+        affected_species_ids=rng.sample(SPECIES_IDS, rng.randint(1, 4)),
+        habitat_loss_acres=round(rng.uniform(5, 2000), 1),
+        habitat_loss_percentage=round(rng.uniform(1, 95), 1),
+    )
+
+
+def make_locations(count: int, time_points: int = 12, seed: int = 0) -> Iterator[LocationDetail]:
+    rng = random.Random(seed)
+    for i in range(count):
+        yield make_location(i, rng, time_points)
+
+
+def write_synthetic_catalogue(path: Path, count: int, time_points: int = 12, seed: int = 0) -> int:
+    """Compile `count` synthetic locations into a catalogue at path, streaming the models"""
+    return write_catalogue(make_locations(count, time_points, seed), path)
+
+
+def make_frame(width: int, height: int, seed: int = 0, tint=(1.0, 1.0, 1.0)):
+    """
+    A BGR uint8 frame with satellite-like structure: smooth terrain, a grid of
+    bright parcels and sensor noise, so histograms and local contrast are
+    realistic enough for the colour normalization code paths.
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    terrain = (
+        np.sin(x / max(width, 1) * 7.0 + seed) * np.cos(y / max(height, 1) * 5.0) * 40.0
+        + np.sin((x + y) / 37.0) * 12.0
+    )
+    parcels = ((x.astype(np.int32) // 48 + y.astype(np.int32) // 48) % 5 == 0) * 70.0
+    frame = np.empty((height, width, 3), dtype=np.float32)
+    for channel, (base, scale) in enumerate(((70, tint[0]), (105, tint[1]), (90, tint[2]))):
+        frame[..., channel] = (base + terrain + parcels) * scale
+    frame += rng.normal(0, 8, size=frame.shape).astype(np.float32)
+    return np.clip(frame, 0, 255).astype(np.uint8)
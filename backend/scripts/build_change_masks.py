@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Precompute change masks and heatmaps between consecutive timeline frames.
+
+For every pair of consecutive time points a boolean change mask and a
+downsampled heatmap are written under app/data/changes/<location-id>/, with a
+changes.json manifest keyed by "<from>_<to>". A pair is only recomputed when
+one of its frames or the parameters change.
+
+Usage:
+    python build_change_masks.py <location_json> <image_directory> [--jobs N]
+
+Example:
+    python build_change_masks.py app/data/locations/mtdora.json \\
+        ../frontend/public/images/timelines/mt-dora-se
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.change_masks import (  # noqa: E402
+    CHANGES_DIR,
+    DEFAULT_HEATMAP_SCALE,
+    DEFAULT_THRESHOLD,
+    MANIFEST_NAME,
+    cache_key,
+    compute_change,
+    pair_name,
+)
+from app.services.timeline_frames import find_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Precompute change masks and heatmaps for a location timeline'
+    )
+    parser.add_argument(
+        'location_json',
+        type=str,
+        help='Location JSON file (e.g., app/data/locations/mtdora.json)'
+    )
+    parser.add_argument(
+        'directory',
+        type=str,
+        help='Directory containing the normalized timeline frames'
+    )
+    parser.add_argument(
+        '--threshold', '-t',
+        type=int,
+        default=DEFAULT_THRESHOLD,
+        help=f'Mean RGB difference (0-255) above which a pixel counts as changed (default: {DEFAULT_THRESHOLD})'
+    )
+    parser.add_argument(
+        '--heatmap-scale',
+        type=int,
+        default=DEFAULT_HEATMAP_SCALE,
+        help=f'Heatmap downsampling factor (default: {DEFAULT_HEATMAP_SCALE})'
+    )
+    parser.add_argument(
+        '--changes-dir',
+        type=str,
+        default=str(CHANGES_DIR),
+        help='Root directory for change data (default: app/data/changes)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Number of worker processes (default: one per CPU core)'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Recompute every pair even if its inputs are unchanged'
+    )
+
+    args = parser.parse_args()
+
+    json_path = Path(args.location_json)
+    image_dir = Path(args.directory)
+
+    if not json_path.exists():
+        print(f"Error: Location JSON '{json_path}' does not exist", file=sys.stderr)
+        sys.exit(1)
+
+    if not image_dir.is_dir():
+        print(f"Error: '{image_dir}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    if not 0 <= args.threshold <= 255:
+        print("Error: --threshold must be between 0 and 255", file=sys.stderr)
+        sys.exit(1)
+
+    if args.heatmap_scale < 1:
+        print("Error: --heatmap-scale must be at least 1", file=sys.stderr)
+        sys.exit(1)
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        location = json.load(f)
+
+    frames = []
+    for time_point in sorted(location.get('time_points', []), key=lambda tp: tp['date']):
+        frame = find_frame(image_dir, time_point['image_url'], time_point['date'])
+        if frame is None:
+            print(f"Warning: No frame found for {time_point['date']}, skipping", file=sys.stderr)
+            continue
+        frames.append((time_point['date'], frame))
+
+    if len(frames) < 2:
+        print("Error: At least two timeline frames are needed", file=sys.stderr)
+        sys.exit(1)
+
+    output_dir = Path(args.changes_dir) / location['id']
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+
+    updated = {}
+    jobs_to_run = []
+    for (from_date, before), (to_date, after) in zip(frames, frames[1:]):
+        name = pair_name(from_date, to_date)
+        key = cache_key(before, after, args.threshold, args.heatmap_scale)
+        previous = manifest.get(name)
+        if (not args.force and previous and previous.get('key') == key
+                and (output_dir / f"{name}.mask").exists() and (output_dir / f"{name}.png").exists()):
+            updated[name] = previous
+            print(f"- {name}: unchanged")
+            continue
+        jobs_to_run.append((name, key, before, after))
+
+    if jobs_to_run:
+        jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=min(jobs, len(jobs_to_run))) as executor:
+            futures = [
+                executor.submit(
+                    compute_change, before, after, output_dir, name, args.threshold, args.heatmap_scale
+                )
+                for name, key, before, after in jobs_to_run
+            ]
+            for (name, key, _, _), future in zip(jobs_to_run, futures):
+                result = future.result()
+                updated[name] = {"key": key, **result}
+                print(f"✓ {name}: {result['changed_fraction']:.1%} changed")
+
+    # Drop outputs for pairs that no longer exist (e.g. a time point was removed)
+    for name in set(manifest) - set(updated):
+        for suffix in ('.mask', '.png'):
+            (output_dir / f"{name}{suffix}").unlink(missing_ok=True)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix('.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(sorted(updated.items())), f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    print(f"\n✓ {len(jobs_to_run)} pair(s) computed, {len(updated) - len(jobs_to_run)} cached -> {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
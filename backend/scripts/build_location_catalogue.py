@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Compile the location JSON files into a single binary catalogue.
+
+Every file is validated against LocationDetail and re-encoded compactly into
+app/data/locations.dflc, together with the listing, map and species indexes
+(see app/services/catalogue.py for the layout). The API maps the catalogue
+instead of parsing each JSON file, so all worker processes share one copy,
+and picks up a rebuilt catalogue without a restart. Delete the catalogue to
+go back to serving the JSON files directly.
+
+Usage:
+    python build_location_catalogue.py [source_directory ...] [--output PATH]
+
+Example:
+    python build_location_catalogue.py app/data/locations
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.catalogue import CATALOGUE_PATH, write_catalogue  # noqa: E402
+from app.services.location_store import DATA_DIR, LocationStore  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Compile location JSON files into a binary catalogue'
+    )
+    parser.add_argument(
+        'sources',
+        type=str,
+        nargs='*',
+        default=[str(DATA_DIR)],
+        help='Directories of location JSON files; on duplicate ids the first directory wins '
+             '(default: app/data/locations)'
+    )
+    parser.add_argument(
+        '--output', '-o',
+        type=str,
+        default=str(CATALOGUE_PATH),
+        help='Catalogue file to write (default: app/data/locations.dflc)'
+    )
+
+    args = parser.parse_args()
+
+    locations = {}
+    for source in args.sources:
+        source_dir = Path(source)
+        if not source_dir.is_dir():
+            print(f"Error: '{source_dir}' is not a directory", file=sys.stderr)
+            sys.exit(1)
+
+        store = LocationStore(data_dir=source_dir, catalogue_path=None)
+        store.refresh(force=True)
+        for location in sorted(store.list_locations(), key=lambda loc: loc.id):
+            if location.id in locations:
+                print(f"Warning: duplicate location id '{location.id}' in {source_dir}, skipping",
+                      file=sys.stderr)
+                continue
+            locations[location.id] = store.get_location(location.id)
+            print(f"✓ {location.id}")
+
+    if not locations:
+        print("Error: No valid location files found", file=sys.stderr)
+        sys.exit(1)
+
+    output = Path(args.output)
+    count = write_catalogue(locations.values(), output)
+    print(f"\n✓ Wrote {count} locations to {output} ({output.stat().st_size:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Build deep-zoom tile pyramids for every time point of a location.
+
+Each timeline frame is cut into a multi-level 256px tile pyramid stored as a
+single .dftp file under app/data/tiles/<location-id>/<date>.dftp. The
+pyramid metadata (size, zoom levels and a versioned tile URL template) is
+written back into the location JSON so LocationDetail advertises it.
+
+Usage:
+    python build_tile_pyramids.py <location_json> <image_directory> [--jobs N]
+
+Example:
+    python build_tile_pyramids.py app/data/locations/mtdora.json \\
+        ../frontend/public/images/timelines/mt-dora-se
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.tile_pyramid import DEFAULT_TILE_SIZE, TILES_DIR, build_pyramid, pyramid_path  # noqa: E402
+from app.services.timeline_frames import find_frame  # noqa: E402
+
+TILE_URL_TEMPLATE = "/api/locations/{location_id}/tiles/{date}/{{z}}/{{x}}/{{y}}?v={version}"
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Build deep-zoom tile pyramids for a location timeline'
+    )
+    parser.add_argument(
+        'location_json',
+        type=str,
+        help='Location JSON file (e.g., app/data/locations/mtdora.json)'
+    )
+    parser.add_argument(
+        'directory',
+        type=str,
+        help='Directory containing the full-resolution timeline frames'
+    )
+    parser.add_argument(
+        '--tile-size',
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+        help=f'Tile edge in pixels (default: {DEFAULT_TILE_SIZE})'
+    )
+    parser.add_argument(
+        '--format',
+        choices=['webp', 'jpeg', 'png'],
+        default='webp',
+        help='Tile image format (default: webp)'
+    )
+    parser.add_argument(
+        '--quality', '-q',
+        type=int,
+        default=80,
+        help='Tile encoder quality (default: 80)'
+    )
+    parser.add_argument(
+        '--tiles-dir',
+        type=str,
+        default=str(TILES_DIR),
+        help='Root directory for pyramid files (default: app/data/tiles)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Number of worker processes (default: one per CPU core)'
+    )
+
+    args = parser.parse_args()
+
+    json_path = Path(args.location_json)
+    image_dir = Path(args.directory)
+
+    if not json_path.exists():
+        print(f"Error: Location JSON '{json_path}' does not exist", file=sys.stderr)
+        sys.exit(1)
+
+    if not image_dir.is_dir():
+        print(f"Error: '{image_dir}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        location = json.load(f)
+
+    location_id = location['id']
+    tiles_dir = Path(args.tiles_dir)
+
+    jobs_to_run = []
+    for time_point in location.get('time_points', []):
+        frame = find_frame(image_dir, time_point['image_url'], time_point['date'])
+        if frame is None:
+            print(f"Warning: No frame found for {time_point['date']}, skipping", file=sys.stderr)
+            continue
+        jobs_to_run.append((time_point, frame))
+
+    if not jobs_to_run:
+        print("Error: No timeline frames found", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=min(jobs, len(jobs_to_run))) as executor:
+        futures = [
+            executor.submit(
+                build_pyramid,
+                frame,
+                pyramid_path(location_id, time_point['date'], tiles_dir),
+                args.tile_size,
+                args.format,
+                args.quality,
+            )
+            for time_point, frame in jobs_to_run
+        ]
+        for (time_point, frame), future in zip(jobs_to_run, futures):
+            meta = future.result()
+            time_point['tiles'] = {
+                "url_template": TILE_URL_TEMPLATE.format(
+                    location_id=location_id, date=time_point['date'], version=meta['version']
+                ),
+                "width": meta['width'],
+                "height": meta['height'],
+                "tile_size": meta['tile_size'],
+                "max_zoom": meta['max_zoom'],
+                "format": meta['format'],
+            }
+            print(f"✓ {time_point['date']}: {frame.name} -> {meta['max_zoom'] + 1} levels")
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(location, f, indent=2, ensure_ascii=False)
+
+    print(f"\n✓ Updated {json_path} with tile pyramid metadata")
+
+
+if __name__ == '__main__':
+    main()
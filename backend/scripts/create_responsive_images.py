@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Create responsive WebP (and optionally AVIF) variants for a directory of timeline images.
+
+Each PNG is decoded once and the desktop, tablet and mobile variants are
+produced from that single decode, each downscaled from the previous one.
+Variants that are already newer than their source, and were encoded with
+the same settings, are skipped. The settings each output was encoded with
+are recorded in MANIFEST_NAME in the image directory; outputs it does not
+list are re-encoded.
+
+By default every variant is encoded at a fixed quality. With --budget and/or
+--min-psnr the encoder searches the quality setting per variant instead:
+  --budget desktop=400 keeps the desktop variant under 400 KB
+  --min-psnr 38 picks the lowest quality that still reaches 38 dB PSNR
+
+Usage:
+    python create_responsive_images.py <image_directory> [--jobs N] [--quality Q] [--force]
+        [--budget SUFFIX=KB ...] [--min-psnr DB] [--avif] [--location-json FILE]
+
+Example:
+    python create_responsive_images.py ../frontend/public/images/timelines/mtdora \\
+        --budget desktop=400 --budget tablet=200 --budget mobile=100 --avif \\
+        --location-json app/data/locations/mtdora.json
+
+Output names match generate_responsive_urls() in generate_location_json.py:
+    {name}.png -> {name}-desktop.webp (1920w), {name}-tablet.webp (1024w), {name}-mobile.webp (640w)
+Sources narrower than a variant's width are not upscaled; that variant
+keeps the source width.
+"""
+
+import argparse
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+# (suffix, width), largest first so each variant can be derived from the previous one
+RESPONSIVE_VARIANTS: List[Tuple[str, int]] = [
+    ("desktop", 1920),
+    ("tablet", 1024),
+    ("mobile", 640),
+]
+
+DEFAULT_QUALITY = 85
+MIN_QUALITY = 30
+MAX_QUALITY = 95
+
+# Pillow save() format name for each output extension
+FORMATS = {"webp": "WEBP", "avif": "AVIF"}
+
+# Output file name -> encode parameters, kept next to the images
+MANIFEST_NAME = ".responsive-variants.json"
+
+
+@dataclass
+class EncodeSettings:
+    """How variants are encoded; passed to every worker."""
+    quality: int = DEFAULT_QUALITY
+    budgets: Dict[str, int] = field(default_factory=dict)  # suffix -> max bytes
+    min_psnr: Optional[float] = None
+    formats: Tuple[str, ...] = ("webp",)
+    force: bool = False
+
+    @property
+    def searches_quality(self) -> bool:
+        return bool(self.budgets) or self.min_psnr is not None
+
+    def params(self, suffix: str) -> Dict[str, Any]:
+        """Parameters that determine a variant's encoding, as recorded in the manifest."""
+        return {
+            "quality": None if self.searches_quality else self.quality,
+            "budget": self.budgets.get(suffix),
+            "min_psnr": self.min_psnr,
+        }
+
+
+def avif_supported() -> bool:
+    """AVIF is built into recent Pillow; older versions need pillow-avif-plugin."""
+    if features.check("avif"):
+        return True
+    try:
+        import pillow_avif  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def variant_path(source: Path, suffix: str, ext: str = "webp") -> Path:
+    """Output path for one variant of a source image."""
+    return source.with_name(f"{source.stem}-{suffix}.{ext}")
+
+
+def load_manifest(image_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Recorded encode parameters per output file name; empty if there is no readable manifest."""
+    try:
+        with open(image_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_manifest(image_dir: Path, manifest: Dict[str, Dict[str, Any]]) -> None:
+    path = image_dir / MANIFEST_NAME
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def stale_variants(
+    source: Path, settings: EncodeSettings, manifest: Optional[Dict[str, Dict[str, Any]]] = None
+) -> List[Tuple[str, int]]:
+    """
+    Variants with any output missing, older than the source, or encoded with
+    other parameters than settings. Without a manifest only mtimes are compared.
+    """
+    if settings.force:
+        return list(RESPONSIVE_VARIANTS)
+    source_mtime = source.stat().st_mtime
+    stale = []
+    for suffix, width in RESPONSIVE_VARIANTS:
+        for ext in settings.formats:
+            output = variant_path(source, suffix, ext)
+            if not output.exists() or output.stat().st_mtime < source_mtime or (
+                manifest is not None and manifest.get(output.name) != settings.params(suffix)
+            ):
+                stale.append((suffix, width))
+                break
+    return stale
+
+
+def resize_to_width(img: Image.Image, width: int) -> Image.Image:
+    """Resize to a target width keeping the aspect ratio (like ImageMagick's -resize Wx)."""
+    height = max(1, round(img.height * width / img.width))
+    return img.resize((width, height), Image.LANCZOS)
+
+
+def encode(img: Image.Image, ext: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    options = {"method": 4} if ext == "webp" else {}
+    img.save(buffer, FORMATS[ext], quality=quality, **options)
+    return buffer.getvalue()
+
+
+def psnr(original: np.ndarray, encoded: bytes) -> float:
+    """Peak signal-to-noise ratio (dB) of an encoded image against the original pixels."""
+    with Image.open(io.BytesIO(encoded)) as decoded:
+        decoded_pixels = np.asarray(decoded.convert("RGB"), dtype=np.float32)
+    mse = np.mean((original - decoded_pixels) ** 2)
+    if mse == 0:
+        return float("inf")
+    return float(10 * np.log10(255.0 ** 2 / mse))
+
+
+def encode_within_limits(img: Image.Image, ext: str, suffix: str, settings: EncodeSettings) -> Tuple[bytes, int]:
+    """
+    Binary-search the quality setting for one variant.
+
+    Finds the lowest quality reaching min_psnr (if set), then lowers it further
+    if needed to fit the variant's byte budget (if set). Without a PSNR target
+    the highest quality that fits the budget is used. If even MIN_QUALITY is
+    over budget, the MIN_QUALITY encoding is returned; callers check the size.
+    """
+    if not settings.searches_quality:
+        return encode(img, ext, settings.quality), settings.quality
+
+    budget = settings.budgets.get(suffix)
+    original = np.asarray(img.convert("RGB"), dtype=np.float32) if settings.min_psnr is not None else None
+    cache: Dict[int, bytes] = {}
+
+    def encoded(quality: int) -> bytes:
+        if quality not in cache:
+            cache[quality] = encode(img, ext, quality)
+        return cache[quality]
+
+    def search(low: int, high: int, acceptable) -> Optional[int]:
+        """Lowest quality in [low, high] for which acceptable() holds, assuming monotonicity."""
+        found = None
+        while low <= high:
+            mid = (low + high) // 2
+            if acceptable(mid):
+                found, high = mid, mid - 1
+            else:
+                low = mid + 1
+        return found
+
+    ceiling = MAX_QUALITY
+    if budget is not None:
+        # Highest quality that fits is one below the lowest quality that doesn't
+        too_big = search(MIN_QUALITY, MAX_QUALITY, lambda q: len(encoded(q)) > budget)
+        ceiling = MAX_QUALITY if too_big is None else max(MIN_QUALITY, too_big - 1)
+
+    quality = ceiling
+    if settings.min_psnr is not None:
+        good_enough = search(MIN_QUALITY, ceiling, lambda q: psnr(original, encoded(q)) >= settings.min_psnr)
+        if good_enough is not None:
+            quality = good_enough
+
+    return encoded(quality), quality
+
+
+def describe_output(path: Path, ext: str) -> Dict[str, Any]:
+    with Image.open(path) as img:
+        width, height = img.size
+    return {"format": ext, "width": width, "height": height, "bytes": path.stat().st_size}
+
+
+def create_variants(
+    source: Path, settings: EncodeSettings, manifest: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Tuple[str, Dict[str, List[Dict[str, Any]]]]:
+    """
+    Decode source once and write its stale variants (see stale_variants()).
+
+    Returns a progress message and, per variant suffix, the format, size and
+    byte count of every output (including ones that were already up to date).
+    """
+    stale = stale_variants(source, settings, manifest)
+    written = []
+
+    if stale:
+        with Image.open(source) as img:
+            img.load()
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+
+            # Downscale in a chain (1920 -> 1024 -> 640) so each step works from the
+            # smallest image that is still at least as wide as the target. Variants
+            # are never upscaled: targets wider than the source get its full width.
+            previous = img
+            for suffix, width in stale:
+                width = min(width, img.width)
+                base = previous if previous.width >= width else img
+                variant = base if base.width == width else resize_to_width(base, width)
+                for ext in settings.formats:
+                    data, quality = encode_within_limits(variant, ext, suffix, settings)
+                    variant_path(source, suffix, ext).write_bytes(data)
+                    written.append(f"{suffix}.{ext} q{quality} {len(data) // 1024}KB")
+                    budget = settings.budgets.get(suffix)
+                    if budget is not None and len(data) > budget:
+                        # Even MIN_QUALITY does not fit; the variant is kept but flagged
+                        print(f"Warning: {variant_path(source, suffix, ext).name} is {len(data):,} bytes "
+                              f"at quality {quality}, over its {budget:,} byte budget", file=sys.stderr)
+                        written[-1] += " (over budget)"
+                previous = variant
+
+    outputs = {}
+    for suffix, _ in RESPONSIVE_VARIANTS:
+        outputs[suffix] = [
+            describe_output(variant_path(source, suffix, ext), ext)
+            for ext in settings.formats
+            if variant_path(source, suffix, ext).exists()
+        ]
+
+    if not written:
+        return f"Skipped: {source.name} (variants up to date)", outputs
+    return f"Processed: {source.name} -> {', '.join(written)}", outputs
+
+
+def update_location_json(json_path: Path, results: Dict[str, Dict[str, List[Dict[str, Any]]]]) -> int:
+    """
+    Record variant URLs, formats and byte sizes on matching time points.
+
+    Time points are matched by the file name of their image_url. Returns the
+    number of time points updated.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        location = json.load(f)
+
+    updated = 0
+    for time_point in location.get("time_points", []):
+        image_url = time_point.get("image_url", "")
+        base_url, _, filename = image_url.rpartition("/")
+        stem = Path(filename).stem
+        if stem not in results:
+            continue
+        variants = []
+        for suffix, outputs in results[stem].items():
+            for output in outputs:
+                variants.append({
+                    "url": f"{base_url}/{stem}-{suffix}.{output['format']}",
+                    **output,
+                })
+        variants.sort(key=lambda v: (v["width"], v["bytes"]))
+        time_point["image_variants"] = variants
+        updated += 1
+
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(location, f, indent=2, ensure_ascii=False)
+
+    return updated
+
+
+def parse_budget(value: str) -> Tuple[str, int]:
+    """Parse SUFFIX=KB, e.g. desktop=400."""
+    suffix, _, kb = value.partition("=")
+    if suffix not in dict(RESPONSIVE_VARIANTS) or not kb.isdigit():
+        raise argparse.ArgumentTypeError(
+            f"expected one of {', '.join(dict(RESPONSIVE_VARIANTS))}=KB, got '{value}'"
+        )
+    return suffix, int(kb) * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Create responsive WebP variants (640w/1024w/1920w) for timeline images'
+    )
+    parser.add_argument(
+        'directory',
+        type=str,
+        help='Directory containing original PNG images (e.g., ../frontend/public/images/timelines/mtdora)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Number of worker processes (default: one per CPU core)'
+    )
+    parser.add_argument(
+        '--quality', '-q',
+        type=int,
+        default=DEFAULT_QUALITY,
+        help=f'Fixed quality when no budget or PSNR target is given (default: {DEFAULT_QUALITY})'
+    )
+    parser.add_argument(
+        '--budget', '-b',
+        type=parse_budget,
+        action='append',
+        default=[],
+        metavar='SUFFIX=KB',
+        help='Maximum size for a variant, e.g. desktop=400 (repeatable)'
+    )
+    parser.add_argument(
+        '--min-psnr',
+        type=float,
+        help='Lowest acceptable PSNR in dB; picks the smallest quality that reaches it'
+    )
+    parser.add_argument(
+        '--avif',
+        action='store_true',
+        help='Also write AVIF variants alongside WebP'
+    )
+    parser.add_argument(
+        '--location-json',
+        type=str,
+        help='Location JSON file to update with variant URLs and byte sizes'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Regenerate variants even if they are up to date'
+    )
+
+    args = parser.parse_args()
+
+    image_dir = Path(args.directory)
+
+    if not image_dir.exists():
+        print(f"Error: Directory '{image_dir}' does not exist", file=sys.stderr)
+        sys.exit(1)
+
+    if not image_dir.is_dir():
+        print(f"Error: '{image_dir}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    if args.avif and not avif_supported():
+        print("Error: AVIF encoding needs Pillow 11.2+ or pillow-avif-plugin", file=sys.stderr)
+        sys.exit(1)
+
+    if args.location_json and not Path(args.location_json).exists():
+        print(f"Error: Location JSON '{args.location_json}' does not exist", file=sys.stderr)
+        sys.exit(1)
+
+    images = sorted(p for p in image_dir.glob("*.png") if p.is_file())
+
+    if not images:
+        print(f"Error: No PNG files found in '{image_dir}'", file=sys.stderr)
+        sys.exit(1)
+
+    settings = EncodeSettings(
+        quality=args.quality,
+        budgets=dict(args.budget),
+        min_psnr=args.min_psnr,
+        formats=("webp", "avif") if args.avif else ("webp",),
+        force=args.force,
+    )
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    manifest = load_manifest(image_dir)
+
+    print("Creating responsive image variants...")
+    print(f"Processing directory: {image_dir}")
+    print(f"Found {len(images)} PNG file(s)")
+    print("")
+
+    results = {}
+    if jobs > 1 and len(images) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(images))) as executor:
+            futures = [executor.submit(create_variants, p, settings, manifest) for p in images]
+            for source, future in zip(images, futures):
+                message, results[source.stem] = future.result()
+                print(message)
+    else:
+        for source in images:
+            message, results[source.stem] = create_variants(source, settings, manifest)
+            print(message)
+
+    # Every output now present was written, or kept, with the current settings
+    for source in images:
+        for suffix, _ in RESPONSIVE_VARIANTS:
+            for ext in settings.formats:
+                output = variant_path(source, suffix, ext)
+                if output.exists():
+                    manifest[output.name] = settings.params(suffix)
+    write_manifest(image_dir, manifest)
+
+    print("")
+    print("✓ All responsive images created!")
+
+    if args.location_json:
+        updated = update_location_json(Path(args.location_json), results)
+        print(f"✓ Recorded variant sizes for {updated} time point(s) in {args.location_json}")
+
+
+if __name__ == '__main__':
+    main()
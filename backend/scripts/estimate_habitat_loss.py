@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Estimate habitat loss for a location from its timeline imagery.
+
+Classifies every pixel of each (ideally color-normalized) timeline frame as
+vegetation or impervious surface and converts the counts to acres using the
+frame's ground resolution. Per-date figures are written onto each time point,
+and the cumulative totals onto the location's habitat_loss_acres and
+habitat_loss_percentage.
+
+Usage:
+    python estimate_habitat_loss.py <location_json> <image_directory> --meters-per-pixel M
+
+Example:
+    python estimate_habitat_loss.py app/data/locations/mtdora.json \\
+        ../frontend/public/images/timelines/mt-dora-se_normalized --meters-per-pixel 0.6
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+# Make the app package importable when run as a script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.habitat_loss import DEFAULT_STRIP_ROWS, estimate_loss  # noqa: E402
+from app.services.timeline_frames import find_frame  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Estimate habitat loss per time point from timeline imagery'
+    )
+    parser.add_argument(
+        'location_json',
+        type=str,
+        help='Location JSON file (e.g., app/data/locations/mtdora.json)'
+    )
+    parser.add_argument(
+        'directory',
+        type=str,
+        help='Directory containing the timeline frames (normalized output works best)'
+    )
+    parser.add_argument(
+        '--meters-per-pixel',
+        type=float,
+        required=True,
+        help='Ground resolution of the frames'
+    )
+    parser.add_argument(
+        '--strip-rows',
+        type=int,
+        default=DEFAULT_STRIP_ROWS,
+        help=f'Rows classified at a time, bounds the float intermediates (default: {DEFAULT_STRIP_ROWS})'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Print the estimates without updating the JSON file'
+    )
+
+    args = parser.parse_args()
+
+    json_path = Path(args.location_json)
+    image_dir = Path(args.directory)
+
+    if not json_path.exists():
+        print(f"Error: Location JSON '{json_path}' does not exist", file=sys.stderr)
+        sys.exit(1)
+
+    if not image_dir.is_dir():
+        print(f"Error: '{image_dir}' is not a directory", file=sys.stderr)
+        sys.exit(1)
+
+    if args.meters_per_pixel <= 0:
+        print("Error: --meters-per-pixel must be positive", file=sys.stderr)
+        sys.exit(1)
+
+    with open(json_path, 'r', encoding='utf-8') as f:
+        location = json.load(f)
+
+    time_points = sorted(location.get('time_points', []), key=lambda tp: tp['date'])
+    frames = []
+    for time_point in time_points:
+        # Downscaled responsive variants would not match --meters-per-pixel
+        frame = find_frame(image_dir, time_point['image_url'], time_point['date'], responsive_fallback=False)
+        if frame is None:
+            print(f"Warning: No full-resolution frame found for {time_point['date']}, skipping", file=sys.stderr)
+            continue
+        frames.append((time_point['date'], frame))
+
+    if not frames:
+        print("Error: No timeline frames found", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        results = estimate_loss(frames, args.meters_per_pixel, args.strip_rows)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"{'date':<12}{'vegetation':>12}{'impervious':>12}{'lost':>10}{'change':>10}")
+    for result in results:
+        print(f"{result['date']:<12}{result['vegetation_acres']:>12.2f}{result['impervious_acres']:>12.2f}"
+              f"{result['habitat_loss_acres']:>10.2f}{result['habitat_loss_acres_change']:>+10.2f}")
+
+    latest = results[-1]
+    print(f"\nHabitat loss: {latest['habitat_loss_acres']} acres ({latest['habitat_loss_percentage']}%)")
+
+    if args.dry_run:
+        return
+
+    by_date = {result['date']: result for result in results}
+    for time_point in location.get('time_points', []):
+        result = by_date.get(time_point['date'])
+        if result:
+            for key in ('vegetation_acres', 'impervious_acres', 'habitat_loss_acres', 'habitat_loss_acres_change'):
+                time_point[key] = result[key]
+
+    location['habitat_loss_acres'] = latest['habitat_loss_acres']
+    location['habitat_loss_percentage'] = latest['habitat_loss_percentage']
+
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(location, f, indent=2, ensure_ascii=False)
+
+    print(f"✓ Updated {json_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -236,7 +236,7 @@ def main():
     print(f"   - Latitude and longitude coordinates")
     print(f"   - Detailed descriptions for each time point")
     print(f"   - Accurate habitat_loss_acres estimate")
-    print(f"2. Create responsive image versions (mobile/tablet/desktop .webp)")
+    print(f"2. Create responsive image versions: python scripts/create_responsive_images.py {image_dir}")
     print(f"3. Move JSON to backend/app/data/locations/")
 
 
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Write Brotli (.br) and gzip (.gz) siblings for compressible static assets.
+
+Run after building the frontend. The API's static file mounts serve these
+variants directly according to Accept-Encoding, so no compression happens
+at request time. Brotli output needs the optional `brotli` package
+(pip install -e ".[precompress]"); without it only .gz files are written.
+
+Variants are only kept when they save at least --min-saving of the original,
+and are skipped when already newer than their source.
+
+Usage:
+    python precompress_assets.py [directory ...] [--min-size BYTES] [--jobs N] [--force]
+
+Example:
+    python precompress_assets.py ../frontend/dist ../static
+"""
+
+import argparse
+import gzip
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_DIRECTORIES = [BASE_DIR / "frontend" / "dist", BASE_DIR / "static"]
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.html', '.js', '.mjs', '.css', '.json', '.geojson', '.map',
+    '.svg', '.txt', '.xml', '.webmanifest', '.wasm', '.ico',
+}
+VARIANT_SUFFIXES = ('.br', '.gz')
+
+
+def find_assets(directory: Path, min_size: int):
+    """Compressible files under directory of at least min_size bytes"""
+    for path in sorted(directory.rglob('*')):
+        if path.is_file() and path.suffix.lower() in COMPRESSIBLE_EXTENSIONS and path.stat().st_size >= min_size:
+            yield path
+
+
+def compress_asset(source: Path, min_saving: float, force: bool):
+    """Create the .br and .gz variants of one file; returns (source, size, {suffix: variant size, None or status})"""
+    source_stat = source.stat()
+    results = {}
+    data = None
+    for suffix in VARIANT_SUFFIXES:
+        if suffix == '.br' and brotli is None:
+            continue
+        variant = source.with_name(source.name + suffix)
+        if not force and variant.exists() and variant.stat().st_mtime >= source_stat.st_mtime:
+            results[suffix] = 'up to date'
+            continue
+        if data is None:
+            data = source.read_bytes()
+        if suffix == '.br':
+            compressed = brotli.compress(data, quality=11)
+        else:
+            compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) > len(data) * (1 - min_saving):
+            # Not worth the Content-Encoding overhead; drop any stale variant
+            variant.unlink(missing_ok=True)
+            results[suffix] = None
+            continue
+        variant_tmp = variant.with_name(variant.name + '.tmp')
+        variant_tmp.write_bytes(compressed)
+        os.replace(variant_tmp, variant)
+        results[suffix] = len(compressed)
+    return source, source_stat.st_size, results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Write .br and .gz variants of compressible static assets'
+    )
+    parser.add_argument(
+        'directories',
+        type=str,
+        nargs='*',
+        default=[str(d) for d in DEFAULT_DIRECTORIES],
+        help='Directories to process (default: frontend/dist and static)'
+    )
+    parser.add_argument(
+        '--min-size',
+        type=int,
+        default=1024,
+        help='Skip files smaller than this many bytes (default: 1024)'
+    )
+    parser.add_argument(
+        '--min-saving',
+        type=float,
+        default=0.1,
+        help='Keep a variant only if it is at least this fraction smaller (default: 0.1)'
+    )
+    parser.add_argument(
+        '--force', '-f',
+        action='store_true',
+        help='Recompress even if the variants are newer than their sources'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=0,
+        help='Number of worker processes (default: one per CPU core)'
+    )
+
+    args = parser.parse_args()
+
+    if brotli is None:
+        print("Warning: brotli is not installed; writing .gz variants only", file=sys.stderr)
+
+    assets = []
+    for directory in args.directories:
+        directory = Path(directory)
+        if not directory.is_dir():
+            print(f"Warning: '{directory}' is not a directory, skipping", file=sys.stderr)
+            continue
+        assets.extend(find_assets(directory, args.min_size))
+
+    if not assets:
+        print("No compressible assets found")
+        return
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    original_total = 0
+    best_total = 0
+    with ProcessPoolExecutor(max_workers=min(jobs, len(assets))) as executor:
+        futures = [executor.submit(compress_asset, path, args.min_saving, args.force) for path in assets]
+        for future in futures:
+            source, size, results = future.result()
+            sizes = [v for v in results.values() if isinstance(v, int)]
+            if sizes:
+                original_total += size
+                best_total += min(sizes)
+            summary = ', '.join(
+                f"{suffix}: {value if isinstance(value, str) else ('skipped' if value is None else f'{value:,}')}"
+                for suffix, value in results.items()
+            )
+            print(f"✓ {source} ({size:,} bytes) -> {summary}")
+
+    print(f"\n✓ {len(assets)} assets; newly compressed files: {original_total:,} -> {best_total:,} bytes")
+
+
+if __name__ == '__main__':
+    main()
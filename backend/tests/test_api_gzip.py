@@ -0,0 +1,127 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.api.caching import cached_response, make_etag
+from app.api.static_files import API_GZIP_MINIMUM_SIZE, ApiGZipMiddleware
+
+LARGE = b'{"items":[' + b",".join(b'{"id":%d}' % i for i in range(500)) + b"]}"
+SMALL = b'{"ok":true}'
+ETAG = make_etag(LARGE)
+GZIP_ETAG = ETAG[:-1] + '-gzip"'
+
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(ApiGZipMiddleware)
+
+    @app.get("/api/large")
+    async def large(request: Request):
+        return cached_response(request, LARGE, ETAG)
+
+    @app.get("/api/small")
+    async def small(request: Request):
+        return cached_response(request, SMALL, make_etag(SMALL))
+
+    @app.get("/api/image")
+    async def image():
+        return Response(LARGE, media_type="image/png", headers={"ETag": ETAG})
+
+    @app.get("/api/encoded")
+    async def encoded():
+        return Response(b"raw", media_type="application/json",
+                        headers={"Content-Encoding": "deflate", "ETag": '"x-deflate"'})
+
+    @app.get("/api/stream")
+    async def stream():
+        return StreamingResponse((LARGE[i:i + 1000] for i in range(0, len(LARGE), 1000)),
+                                 media_type="application/json")
+
+    @app.get("/other/large")
+    async def other():
+        return Response(LARGE, media_type="application/json")
+
+    return app
+
+
+@pytest.fixture(scope="module")
+def client() -> TestClient:
+    return TestClient(make_app())
+
+
+def get(client, path, encoding="gzip", if_none_match=None):
+    headers = {"accept-encoding": encoding}
+    if if_none_match:
+        headers["if-none-match"] = if_none_match
+    # Keep the raw body so the test sees exactly what was sent
+    with client.stream("GET", path, headers=headers) as response:
+        response.raw_body = b"".join(response.iter_raw())
+    return response
+
+
+def test_compresses_with_own_etag(client):
+    response = get(client, "/api/large")
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == GZIP_ETAG
+    assert "accept-encoding" in response.headers["vary"].lower()
+    assert int(response.headers["content-length"]) == len(response.raw_body)
+    assert gzip.decompress(response.raw_body) == LARGE
+
+
+@pytest.mark.parametrize("encoding", ["identity", "gzip;q=0", "br"])
+def test_identity_when_gzip_not_accepted(client, encoding):
+    response = get(client, "/api/large", encoding)
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+    assert response.raw_body == LARGE
+
+
+@pytest.mark.parametrize("encoding, sent, expected", [
+    ("gzip", GZIP_ETAG, GZIP_ETAG),
+    ("gzip", ETAG, ETAG),
+    ("identity", ETAG, ETAG),
+    ("identity", GZIP_ETAG, ETAG),
+    ("gzip", f'"other", W/{GZIP_ETAG}', GZIP_ETAG),
+])
+def test_not_modified_for_either_form(client, encoding, sent, expected):
+    response = get(client, "/api/large", encoding, if_none_match=sent)
+    assert response.status_code == 304
+    assert response.headers["etag"] == expected
+    assert "content-encoding" not in response.headers
+    assert response.raw_body == b""
+
+
+def test_stale_etag_gets_full_body(client):
+    response = get(client, "/api/large", if_none_match='"stale-gzip"')
+    assert response.status_code == 200
+    assert gzip.decompress(response.raw_body) == LARGE
+
+
+@pytest.mark.parametrize("path", ["/api/small", "/api/image", "/other/large"])
+def test_passes_through_untouched(client, path):
+    response = get(client, path)
+    assert "content-encoding" not in response.headers
+    assert len(response.raw_body) in (len(SMALL), len(LARGE))
+    assert not response.headers.get("etag", "").endswith('-gzip"')
+
+
+def test_keeps_app_encoding(client):
+    response = get(client, "/api/encoded")
+    assert response.headers["content-encoding"] == "deflate"
+    assert response.headers["etag"] == '"x-deflate"'
+    assert response.raw_body == b"raw"
+
+
+def test_streams_gzip(client):
+    response = get(client, "/api/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert gzip.decompress(response.raw_body) == LARGE
+
+
+def test_minimum_size_matches_setting():
+    assert len(SMALL) < API_GZIP_MINIMUM_SIZE < len(LARGE)
@@ -0,0 +1,151 @@
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from app.services.catalogue import HEADER, MAGIC, Catalogue, write_catalogue
+from app.services.location_listing import SORT_KEYS, Cursor
+from app.services.location_store import DATA_DIR, LocationStore
+from app.services.spatial_index import BoundingBox
+from app.services.species_store import SPECIES_PATH, SpeciesStore
+from benchmarks.synthetic import SPECIES_IDS, make_locations
+
+
+@pytest.fixture(scope="module")
+def json_dir(tmp_path_factory) -> Path:
+    """The shipped location files plus synthetic ones, so every index has several groups and pages"""
+    directory = tmp_path_factory.mktemp("locations")
+    for path in DATA_DIR.glob("*.json"):
+        shutil.copy(path, directory)
+    for location in make_locations(300, time_points=3):
+        (directory / f"{location.id}.json").write_text(location.model_dump_json())
+    return directory
+
+
+@pytest.fixture(scope="module")
+def stores(json_dir, tmp_path_factory):
+    """(JSON-directory store, catalogue store) over the same locations"""
+    from_json = LocationStore(data_dir=json_dir, catalogue_path=None)
+    from_json.refresh(force=True)
+
+    catalogue_path = tmp_path_factory.mktemp("catalogue") / "locations.dflc"
+    ids = sorted(location.id for location in from_json.list_locations())
+    assert write_catalogue((from_json.get_location(i) for i in ids), catalogue_path) == len(ids)
+    from_catalogue = LocationStore(data_dir=json_dir, catalogue_path=catalogue_path)
+    from_catalogue.refresh(force=True)
+    assert isinstance(from_catalogue._by_id, Catalogue)
+    return from_json, from_catalogue
+
+
+def location_ids(store: LocationStore):
+    return [location.id for location in store.list_locations()]
+
+
+def test_list_and_details_identical(stores):
+    from_json, from_catalogue = stores
+    assert bytes(from_catalogue.list_json()[0]) == from_json.list_json()[0]
+    assert location_ids(from_catalogue) == location_ids(from_json)
+    for location_id in location_ids(from_json):
+        expected = from_json.get_entry(location_id)
+        entry = from_catalogue.get_entry(location_id)
+        assert bytes(entry.detail_json) == expected.detail_json
+        assert bytes(entry.summary_json) == expected.summary_json
+        assert entry.detail_etag == expected.detail_etag
+        assert entry.species_ids == expected.species_ids
+    assert from_catalogue.get_entry("missing") is None
+
+
+def test_species_identical(stores):
+    from_json, from_catalogue = stores
+    species = [SpeciesStore(SPECIES_PATH, store) for store in stores]
+    assert species[0].list_json() == species[1].list_json()
+    for species_id in SPECIES_IDS + ["missing"]:
+        assert species[0].species_json(species_id) == species[1].species_json(species_id)
+    for location_id in location_ids(from_json):
+        assert species[0].location_species_json(location_id) == species[1].location_species_json(location_id)
+
+
+@pytest.mark.parametrize("sort", SORT_KEYS)
+@pytest.mark.parametrize("filters", [None, {"county": "lake"}, {"county": "Orange", "ecosystem_type": "scrub"}])
+def test_pages_identical(stores, sort, filters):
+    for descending in (False, True):
+        pages = []
+        for store in stores:
+            bodies = []
+            cursor = None
+            while True:
+                body, _ = store.page_json(sort, descending, filters, cursor, limit=7)
+                bodies.append(body)
+                token = json.loads(body)["next_cursor"]
+                if token is None:
+                    break
+                cursor = Cursor.decode(token)
+            pages.append(bodies)
+        assert pages[0] == pages[1]
+
+
+@pytest.mark.parametrize("zoom", [3, 7, 12])
+def test_map_views_identical(stores, zoom):
+    for bbox in (BoundingBox(-180, -90, 180, 90), BoundingBox(-82.5, 27.0, -80.0, 29.5)):
+        assert stores[0].map_view_json(bbox, zoom) == stores[1].map_view_json(bbox, zoom)
+
+
+def test_replaced_catalogue_is_picked_up(stores, tmp_path):
+    from_json, _ = stores
+    path = tmp_path / "locations.dflc"
+    ids = sorted(location_ids(from_json))
+    write_catalogue((from_json.get_location(i) for i in ids[:10]), path)
+    store = LocationStore(catalogue_path=path, check_interval=0)
+    old_entry = store.get_entry(ids[0])
+
+    write_catalogue((from_json.get_location(i) for i in ids[5:20]), path)
+    assert store.refresh()
+    assert len(store.list_locations()) == 15
+    assert store.get_entry(ids[0]) is None
+    # Entries from the old mapping stay readable after the swap
+    assert bytes(old_entry.detail_json) == from_json.get_entry(ids[0]).detail_json
+
+
+def test_duplicate_ids_rejected(stores, tmp_path):
+    from_json, _ = stores
+    location = from_json.get_location(location_ids(from_json)[0])
+    with pytest.raises(ValueError, match="duplicate"):
+        write_catalogue([location, location], tmp_path / "locations.dflc")
+
+
+@pytest.fixture
+def valid_catalogue(stores, tmp_path) -> bytes:
+    from_json, _ = stores
+    path = tmp_path / "valid.dflc"
+    write_catalogue((from_json.get_location(i) for i in sorted(location_ids(from_json))[:20]), path)
+    return path.read_bytes()
+
+
+@pytest.mark.parametrize("corrupt", [
+    pytest.param(lambda data: data[:HEADER.size], id="header only"),
+    pytest.param(lambda data: data[:len(data) // 2], id="truncated"),
+    pytest.param(lambda data: b"XXXX" + data[len(MAGIC):], id="wrong magic"),
+    pytest.param(lambda data: data[:4] + (2).to_bytes(2, "little") + data[6:], id="old version"),
+    pytest.param(lambda data: data[:4] + (99).to_bytes(2, "little") + data[6:], id="future version"),
+    pytest.param(lambda data: b"", id="empty"),
+])
+def test_invalid_catalogue_rejected(valid_catalogue, tmp_path, corrupt):
+    path = tmp_path / "bad.dflc"
+    path.write_bytes(corrupt(valid_catalogue))
+    with pytest.raises(ValueError):
+        Catalogue(path)
+
+
+def test_invalid_replacement_keeps_previous_catalogue(valid_catalogue, tmp_path):
+    path = tmp_path / "locations.dflc"
+    path.write_bytes(valid_catalogue)
+    store = LocationStore(catalogue_path=path, check_interval=0)
+    locations = location_ids(store)
+    assert len(locations) == 20
+
+    replacement = tmp_path / "replacement.dflc"
+    replacement.write_bytes(valid_catalogue[:len(valid_catalogue) // 2])
+    replacement.replace(path)
+    assert not store.refresh()
+    assert location_ids(store) == locations
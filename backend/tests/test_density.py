@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from app.models.density import DevelopmentPattern
+from app.services import density
+from app.services.density import DEVELOPMENT_PATTERNS, calculate, sweep
+
+POPULATIONS = list(range(0, 4000, 1)) + [10_000, 123_457, 1_000_000, 7_654_321]
+PEOPLE_PER_UNIT = [1.0, 2.5, 2.3, 3.1]
+COLUMNS = {
+    "total_units_needed": 0,
+    "residential_acres": 2,
+    "infrastructure_acres": 2,
+    "total_acres": 2,
+    "comparison_football_fields": 1,
+    "estimated_co2_tons_per_year": 0,
+    "vehicle_miles_per_year": 0,
+}
+CUSTOM = DevelopmentPattern(
+    id="custom", name="Custom", units_per_acre=12.5, avg_unit_size_sqft=1200,
+    description="Odd ratios to hit more ties", parking_spaces_per_unit=1.7,
+    road_width_feet=30, typical_lot_coverage=0.5,
+)
+
+
+def mismatches(pattern):
+    """(column, population, people_per_unit, sweep value, calculate() value) wherever the two differ"""
+    result = sweep([pattern], POPULATIONS, PEOPLE_PER_UNIT)
+    found = []
+    for series in result.series:
+        for k, population in enumerate(POPULATIONS):
+            expected = calculate(pattern, population, series.people_per_unit)
+            for name in COLUMNS:
+                if getattr(series, name)[k] != getattr(expected, name):
+                    found.append((name, population, series.people_per_unit,
+                                  getattr(series, name)[k], getattr(expected, name)))
+    return found
+
+
+def test_inputs_include_near_ties(monkeypatch):
+    """With plain np.round the sweep disagrees on these inputs, so the parity test exercises _round"""
+    monkeypatch.setattr(density, "_round", lambda values, ndigits: np.round(values, ndigits))
+    assert any(mismatches(pattern) for pattern in DEVELOPMENT_PATTERNS)
+
+
+@pytest.mark.parametrize("pattern", DEVELOPMENT_PATTERNS + [CUSTOM], ids=lambda p: p.id)
+def test_sweep_matches_calculate(pattern):
+    result = sweep([pattern], POPULATIONS, PEOPLE_PER_UNIT)
+    assert result.populations == POPULATIONS
+    assert [(s.pattern_id, s.people_per_unit) for s in result.series] == [(pattern.id, r) for r in PEOPLE_PER_UNIT]
+
+    assert mismatches(pattern) == []
+
+
+def test_round_matches_builtin_on_ties():
+    values = np.array([0.125, 0.375, 2.675, 1.005, 0.475, 1.5, 2.5, -0.5, 1234.565, 0.0])
+    for ndigits in (0, 1, 2):
+        assert density._round(values.copy(), ndigits).tolist() == [round(float(v), ndigits) for v in values]
+
+
+@pytest.mark.parametrize("body, status", [
+    ({"population_range": {"start": 0, "stop": 10 ** 15, "step": 1}}, 400),
+    ({"population_range": {"start": 0, "stop": 10, "step": 0}}, 400),
+    ({"population_range": {"start": 1000, "stop": 4000, "step": 1000}, "populations": [10]}, 200),
+])
+def test_sweep_route_limits(body, status):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    response = TestClient(app).post("/api/density/sweep", json=body)
+    assert response.status_code == status
+    if status == 200:
+        assert response.json()["populations"] == [10, 1000, 2000, 3000]
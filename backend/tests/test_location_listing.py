@@ -0,0 +1,62 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.location_listing import ListingIndex
+
+COUNTIES = ("Lake", "Orange", "Volusia")
+ECOSYSTEMS = ("Sandhill", "Scrub", "Wetland", "Hammock")
+
+
+def make_entry(i: int) -> SimpleNamespace:
+    return SimpleNamespace(summary=SimpleNamespace(
+        id=f"loc-{i:03d}",
+        name=f"Location {i % 17}",
+        county=COUNTIES[i % len(COUNTIES)],
+        ecosystem_type=ECOSYSTEMS[i % len(ECOSYSTEMS)],
+    ))
+
+
+@pytest.fixture(scope="module")
+def index() -> ListingIndex:
+    return ListingIndex(make_entry(i) for i in range(100))
+
+
+def walk(index: ListingIndex, limit: int, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        entries, cursor = index.page(cursor=cursor, limit=limit, **kwargs)
+        pages.append(([e.summary.id for e in entries], cursor))
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("descending", [False, True])
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 8, 100])
+@pytest.mark.parametrize("sort", ["id", "name", "county", "ecosystem_type"])
+def test_two_filter_walk_ends_on_last_match(index, sort, descending, limit):
+    filters = {"county": "lake", "ecosystem_type": "SCRUB"}
+    expected = sorted(
+        (e.summary for e in map(make_entry, range(100))
+         if e.summary.county == "Lake" and e.summary.ecosystem_type == "Scrub"),
+        key=lambda s: (getattr(s, sort).casefold(), s.id),
+        reverse=descending,
+    )
+
+    pages = walk(index, limit, sort=sort, descending=descending, filters=filters)
+
+    assert [i for ids, _ in pages for i in ids] == [s.id for s in expected]
+    # Only the final page lacks a cursor, and every page a cursor leads to has results
+    assert all(ids for ids, _ in pages)
+    assert pages[-1][1] is None
+    assert all(cursor is not None for _, cursor in pages[:-1])
+
+
+def test_unfiltered_walk_has_no_trailing_empty_page(index):
+    pages = walk(index, 10)
+    assert [len(ids) for ids, _ in pages] == [10] * 10
+
+
+def test_no_matches(index):
+    assert index.page(filters={"county": "Lake", "ecosystem_type": "Nowhere"}) == ([], None)
@@ -7,17 +7,23 @@ and applies color normalization to ensure consistent color grading across all im
 This creates a seamless visual experience when viewing images as a timelapse.
 
 Usage:
-    python normalize_satellite_colors.py <input_directory> [--output <output_directory>] [--method <method>]
+    python normalize_satellite_colors.py <input_directory> [--output <output_directory>] [--method <method>] [--jobs N] [--streaming] [--incremental]
 
 Methods:
     - histogram: Histogram matching to a reference image (default)
     - mean_std: Match mean and standard deviation across images
     - clahe: Contrast Limited Adaptive Histogram Equalization
+
+With --incremental, a manifest of input hashes is kept in the output directory
+and only new or changed images are processed on later runs.
 """
 
 import argparse
+import hashlib
+import json
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from typing import List, Tuple, Optional
 import numpy as np
@@ -25,22 +31,28 @@ from PIL import Image
 import cv2
 
 
+SUPPORTED_FORMATS = {'.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff'}
+
+
+def find_images(directory: Path) -> List[Path]:
+    """List supported image files in directory, sorted by name."""
+    return [p for p in sorted(directory.glob('*')) if p.suffix.lower() in SUPPORTED_FORMATS]
+
+
 def load_images(directory: Path) -> List[Tuple[str, np.ndarray]]:
     """Load all images from directory."""
-    supported_formats = {'.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff'}
     images = []
 
-    for file_path in sorted(directory.glob('*')):
-        if file_path.suffix.lower() in supported_formats:
-            try:
-                img = cv2.imread(str(file_path))
-                if img is not None:
-                    images.append((str(file_path), img))
-                    print(f"Loaded: {file_path.name}")
-                else:
-                    print(f"Warning: Could not load {file_path.name}")
-            except Exception as e:
-                print(f"Error loading {file_path.name}: {e}")
+    for file_path in find_images(directory):
+        try:
+            img = cv2.imread(str(file_path))
+            if img is not None:
+                images.append((str(file_path), img))
+                print(f"Loaded: {file_path.name}")
+            else:
+                print(f"Warning: Could not load {file_path.name}")
+        except Exception as e:
+            print(f"Error loading {file_path.name}: {e}")
 
     return images
 
@@ -82,38 +94,64 @@ def normalize_mean_std(img: np.ndarray, ref_mean: np.ndarray, ref_std: np.ndarra
     return normalized.astype(np.uint8)
 
 
-def histogram_matching(source: np.ndarray, reference: np.ndarray) -> np.ndarray:
-    """Match histogram of source image to reference image."""
-    matched = np.zeros_like(source)
+def channel_cdfs(img: np.ndarray) -> np.ndarray:
+    """Normalized cumulative histograms of the three BGR channels, shape (3, 256)."""
+    cdfs = np.empty((3, 256), dtype=np.float64)
+    for i in range(3):
+        hist = np.bincount(img[:, :, i].ravel(), minlength=256)
+        cdf = hist.cumsum()
+        cdfs[i] = cdf / cdf[-1]
+    return cdfs
+
+
+class ReferenceProfile:
+    """
+    Histogram-matching target: the per-channel CDFs of a reference image.
+
+    The CDFs are computed once and reused for every source image. Profiles can
+    be saved and loaded, so other tools can match against a stored reference
+    without keeping the reference image itself.
+    """
+
+    def __init__(self, cdfs: np.ndarray):
+        self.cdfs = np.asarray(cdfs, dtype=np.float64)
+
+    @classmethod
+    def from_image(cls, reference: np.ndarray) -> 'ReferenceProfile':
+        return cls(channel_cdfs(reference))
 
-    for i in range(3):  # Process each BGR channel
-        source_channel = source[:, :, i]
-        reference_channel = reference[:, :, i]
+    @classmethod
+    def load(cls, path: Path) -> 'ReferenceProfile':
+        return cls(np.load(str(path)))
 
-        # Calculate histograms
-        source_hist, _ = np.histogram(source_channel.flatten(), 256, [0, 256])
-        reference_hist, _ = np.histogram(reference_channel.flatten(), 256, [0, 256])
+    def save(self, path: Path) -> None:
+        np.save(str(path), self.cdfs)
 
-        # Calculate CDFs
-        source_cdf = source_hist.cumsum()
-        reference_cdf = reference_hist.cumsum()
+    def lookup_table(self, source: np.ndarray) -> np.ndarray:
+        """
+        Build a (1, 256, 3) table mapping each source level to the reference level.
 
-        # Normalize CDFs
-        source_cdf = source_cdf / source_cdf[-1]
-        reference_cdf = reference_cdf / reference_cdf[-1]
+        For each channel this picks the first reference level whose CDF reaches
+        the source CDF, found with a vectorized binary search.
+        """
+        source_cdfs = channel_cdfs(source)
+        table = np.empty((1, 256, 3), dtype=np.uint8)
+        for i in range(3):
+            levels = np.searchsorted(self.cdfs[i], source_cdfs[i], side='left')
+            table[0, :, i] = np.minimum(levels, 255)
+        return table
 
-        # Create lookup table
-        lookup_table = np.zeros(256, dtype=np.uint8)
-        ref_idx = 0
-        for src_idx in range(256):
-            while ref_idx < 255 and reference_cdf[ref_idx] < source_cdf[src_idx]:
-                ref_idx += 1
-            lookup_table[src_idx] = ref_idx
+    def match(self, source: np.ndarray) -> np.ndarray:
+        """Match the histogram of source to this profile."""
+        # cv2.LUT applies a 3-channel table to all channels in one pass
+        return cv2.LUT(source, self.lookup_table(source))
 
-        # Apply lookup table
-        matched[:, :, i] = lookup_table[source_channel]
 
-    return matched
+def histogram_matching(source: np.ndarray, reference) -> np.ndarray:
+    """Match histogram of source image to a reference image or ReferenceProfile."""
+    if not isinstance(reference, ReferenceProfile):
+        reference = ReferenceProfile.from_image(reference)
+    return reference.match(source)
 
 
 def apply_clahe(img: np.ndarray, clip_limit: float = 2.0, tile_size: int = 8) -> np.ndarray:
@@ -159,74 +197,431 @@ def create_average_reference(images: List[np.ndarray]) -> np.ndarray:
     return avg_img
 
 
+def read_image_shape(file_path: Path) -> Optional[Tuple[int, int]]:
+    """Read (height, width) from an image header without decoding the pixels."""
+    try:
+        with Image.open(file_path) as img:
+            width, height = img.size
+        return height, width
+    except Exception:
+        return None
+
+
+class ReferenceAccumulator:
+    """
+    Build the average reference image and reference statistics one image at a time.
+
+    Only a running integer sum and the current frame are held in memory. Integer
+    sums are exact, so the result matches create_average_reference() and
+    calculate_reference_stats() run over the whole stack.
+    """
+
+    def __init__(
+        self,
+        target_shape: Optional[Tuple[int, int]],
+        max_images: int,
+        need_average: bool = True,
+        need_stats: bool = True
+    ):
+        self.target_shape = target_shape
+        self.need_average = need_average
+        self.need_stats = need_stats
+        self.count = 0
+        # 255 * 257 still fits in uint16, which keeps the sum at two bytes per value
+        self._dtype = np.uint16 if max_images <= 257 else np.uint32
+        self._sum = None
+        self._means = []
+        self._stds = []
+
+    def add(self, img: np.ndarray) -> None:
+        if self.need_stats:
+            self._means.append(cv2.mean(img)[:3])  # BGR channels
+            self._stds.append(cv2.meanStdDev(img)[1].flatten()[:3])
+
+        if self.need_average:
+            if self.target_shape and img.shape[:2] != self.target_shape:
+                target_height, target_width = self.target_shape
+                img = cv2.resize(img, (target_width, target_height))
+            if self._sum is None:
+                self._sum = np.zeros(img.shape, dtype=self._dtype)
+            np.add(self._sum, img, out=self._sum)
+
+        self.count += 1
+
+    def average(self) -> np.ndarray:
+        """Average image, truncated to uint8 like create_average_reference()."""
+        # Integer floor division avoids a float64 copy of the frame
+        return np.floor_divide(self._sum, self.count).astype(np.uint8)
+
+    def stats(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Reference mean and std, as calculate_reference_stats() returns them."""
+        return np.mean(self._means, axis=0), np.mean(self._stds, axis=0)
+
+
+def accumulate_reference(
+    paths: List[Path],
+    need_average: bool,
+    need_stats: bool
+) -> Tuple[ReferenceAccumulator, List[Path]]:
+    """Single streaming pass over paths. Returns the accumulator and the paths that loaded."""
+    target_shape = None
+    if need_average:
+        shapes = [shape for shape in (read_image_shape(p) for p in paths) if shape]
+        if len(set(shapes)) > 1:
+            print("Warning: Images have different sizes. Using median size.")
+            heights, widths = zip(*shapes)
+            target_shape = (int(np.median(heights)), int(np.median(widths)))
+
+    accumulator = ReferenceAccumulator(target_shape, len(paths), need_average, need_stats)
+    loaded = []
+    for file_path in paths:
+        img = cv2.imread(str(file_path))
+        if img is None:
+            print(f"Warning: Could not load {file_path.name}")
+            continue
+        accumulator.add(img)
+        loaded.append(file_path)
+        print(f"Accumulated: {file_path.name}")
+
+    return accumulator, loaded
+
+
+def normalize_image(img: np.ndarray, method: str, reference=None) -> np.ndarray:
+    """
+    Apply one normalization method to an image.
+
+    reference is a reference image or ReferenceProfile for 'histogram', a
+    (mean, std) tuple for 'mean_std' and unused for 'clahe'.
+    """
+    if method == 'histogram':
+        return histogram_matching(img, reference)
+    elif method == 'mean_std':
+        ref_mean, ref_std = reference
+        return normalize_mean_std(img, ref_mean, ref_std)
+    elif method == 'clahe':
+        return apply_clahe(img)
+    raise ValueError(f"Unknown method: {method}")
+
+
+# Per-process state for parallel runs, set once by _init_worker so the
+# reference is pickled once per worker rather than once per image
+_worker_state = {}
+
+
+def _init_worker(method: str, reference, output_dir: Path) -> None:
+    # Workers already run in parallel; keep OpenCV from oversubscribing cores
+    cv2.setNumThreads(1)
+    _worker_state.update(method=method, reference=reference, output_dir=output_dir)
+
+
+def normalize_file(file_path: str, method: str, reference, output_dir: Path) -> str:
+    """Read, normalize and write a single image. Returns a progress message."""
+    img = cv2.imread(file_path)
+    if img is None:
+        return f"Warning: Could not load {Path(file_path).name}"
+    result = normalize_image(img, method, reference)
+    output_path = output_dir / Path(file_path).name
+    cv2.imwrite(str(output_path), result)
+    return f"Processed: {Path(file_path).name} -> {output_path.name}"
+
+
+def _process_file(file_path: str) -> str:
+    return normalize_file(
+        file_path,
+        _worker_state['method'],
+        _worker_state['reference'],
+        _worker_state['output_dir']
+    )
+
+
+def normalize_files(
+    paths: List[Path],
+    method: str,
+    reference,
+    output_dir: Path,
+    jobs: int = 1
+) -> None:
+    """Normalize images one file at a time, across a process pool if jobs > 1."""
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(
+            max_workers=min(jobs, len(paths)),
+            initializer=_init_worker,
+            initargs=(method, reference, output_dir)
+        ) as executor:
+            for message in executor.map(_process_file, [str(p) for p in paths]):
+                print(message)
+    else:
+        for file_path in paths:
+            print(normalize_file(str(file_path), method, reference, output_dir))
+
+
 def process_images(
     input_dir: Path,
     output_dir: Path,
     method: str = 'histogram',
-    reference_image: Optional[str] = None
+    reference_image: Optional[str] = None,
+    jobs: int = 1,
+    streaming: bool = False
 ) -> None:
-    """Process all images in directory with chosen normalization method."""
+    """
+    Process all images in directory with chosen normalization method.
+
+    With streaming, images are never all held in memory: the reference is
+    accumulated in one pass and each image is re-read when it is normalized.
+    """
 
     # Load images
     print(f"\nLoading images from: {input_dir}")
-    image_data = load_images(input_dir)
+    if streaming:
+        image_data = None
+        paths = find_images(input_dir)
+    else:
+        image_data = load_images(input_dir)
+        paths = [Path(file_path) for file_path, _ in image_data]
 
-    if not image_data:
+    if not paths:
         print("Error: No images found in directory!")
         sys.exit(1)
 
-    print(f"Found {len(image_data)} images\n")
+    print(f"Found {len(paths)} images\n")
 
     # Create output directory
     output_dir.mkdir(parents=True, exist_ok=True)
 
     # Extract images (without filenames)
-    images = [img for _, img in image_data]
-
-    # Process based on method
+    images = [img for _, img in image_data] if image_data else None
+
+    use_reference_file = method == 'histogram' and reference_image and Path(reference_image).exists()
+    accumulator = None
+    if streaming and (method == 'mean_std' or (method == 'histogram' and not use_reference_file)):
+        print("Accumulating reference in a single pass...")
+        accumulator, paths = accumulate_reference(
+            paths,
+            need_average=method == 'histogram',
+            need_stats=method == 'mean_std'
+        )
+        if not paths:
+            print("Error: No images could be loaded!")
+            sys.exit(1)
+
+    # Build the reference for the chosen method
+    reference = None
     if method == 'histogram':
         # Use specified reference or create average reference
-        if reference_image and Path(reference_image).exists():
+        if use_reference_file and Path(reference_image).suffix == '.npy':
+            print(f"Using reference profile: {reference_image}")
+            reference = ReferenceProfile.load(Path(reference_image))
+        elif use_reference_file:
             print(f"Using reference image: {reference_image}")
-            ref_img = cv2.imread(reference_image)
+            reference = ReferenceProfile.from_image(cv2.imread(reference_image))
         else:
-            ref_img = create_average_reference(images)
+            if accumulator is not None:
+                print("Creating average reference image...")
+                ref_img = accumulator.average()
+            else:
+                ref_img = create_average_reference(images)
             # Save reference image
             ref_path = output_dir / '_reference.jpg'
             cv2.imwrite(str(ref_path), ref_img)
             print(f"Saved reference image to: {ref_path}")
 
+            # Save the profile so later runs or other tools can match against it
+            reference = ReferenceProfile.from_image(ref_img)
+            profile_path = output_dir / '_reference_profile.npy'
+            reference.save(profile_path)
+            print(f"Saved reference profile to: {profile_path}")
+
         print("\nApplying histogram matching...\n")
-        for file_path, img in image_data:
-            matched = histogram_matching(img, ref_img)
-            output_path = output_dir / Path(file_path).name
-            cv2.imwrite(str(output_path), matched)
-            print(f"Processed: {Path(file_path).name} -> {output_path.name}")
 
     elif method == 'mean_std':
         print("\nCalculating reference statistics...")
-        ref_mean, ref_std = calculate_reference_stats(images)
+        if accumulator is not None:
+            ref_mean, ref_std = accumulator.stats()
+        else:
+            ref_mean, ref_std = calculate_reference_stats(images)
+        reference = (ref_mean, ref_std)
         print(f"Reference mean: {ref_mean}")
         print(f"Reference std: {ref_std}\n")
 
         print("Normalizing images...\n")
-        for file_path, img in image_data:
-            normalized = normalize_mean_std(img, ref_mean, ref_std)
-            output_path = output_dir / Path(file_path).name
-            cv2.imwrite(str(output_path), normalized)
-            print(f"Processed: {Path(file_path).name} -> {output_path.name}")
 
     elif method == 'clahe':
         print("\nApplying CLAHE...\n")
+
+    if jobs > 1 and len(paths) > 1:
+        # Workers re-read their own input, so drop the decoded frames here
+        del images, image_data
+        normalize_files(paths, method, reference, output_dir, jobs)
+    elif streaming:
+        normalize_files(paths, method, reference, output_dir)
+    else:
         for file_path, img in image_data:
-            enhanced = apply_clahe(img)
+            result = normalize_image(img, method, reference)
             output_path = output_dir / Path(file_path).name
-            cv2.imwrite(str(output_path), enhanced)
+            cv2.imwrite(str(output_path), result)
             print(f"Processed: {Path(file_path).name} -> {output_path.name}")
 
     print(f"\nComplete! Processed images saved to: {output_dir}")
 
 
+MANIFEST_NAME = '_manifest.json'
+MANIFEST_VERSION = 1
+
+
+def file_sha256(file_path: Path) -> str:
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+
+def method_parameters(method: str, reference_image: Optional[str]) -> dict:
+    """Settings that change the output for a method; any change forces a full rebuild."""
+    if method == 'histogram':
+        return {'reference': file_sha256(Path(reference_image)) if reference_image else 'average'}
+    elif method == 'clahe':
+        return {'clip_limit': 2.0, 'tile_size': 8}
+    return {}
+
+
+def load_manifest(output_dir: Path) -> Optional[dict]:
+    try:
+        with open(output_dir / MANIFEST_NAME, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(output_dir: Path, manifest: dict) -> None:
+    # Write then rename so an interrupted run never leaves a truncated manifest
+    tmp_path = output_dir / (MANIFEST_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, output_dir / MANIFEST_NAME)
+
+
+def process_images_incremental(
+    input_dir: Path,
+    output_dir: Path,
+    method: str = 'histogram',
+    reference_image: Optional[str] = None,
+    jobs: int = 1,
+    rebuild_reference: bool = False
+) -> None:
+    """
+    Process only images that are new or changed since the last incremental run.
+
+    The manifest records each input's content hash, the method and its
+    parameters, and a fingerprint of the reference. An average reference (or
+    mean_std statistics) is kept as long as every image it was built from is
+    unchanged, so adding a capture only processes that capture. If one of those
+    images changes or disappears, or with rebuild_reference, the reference is
+    rebuilt from the current inputs and everything is reprocessed.
+    """
+    print(f"\nScanning images in: {input_dir}")
+    paths = find_images(input_dir)
+    if not paths:
+        print("Error: No images found in directory!")
+        sys.exit(1)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if method != 'histogram' or (reference_image and not Path(reference_image).exists()):
+        reference_image = None
+
+    hashes = {p.name: file_sha256(p) for p in paths}
+    parameters = method_parameters(method, reference_image)
+
+    manifest = load_manifest(output_dir)
+    if manifest and (manifest.get('method') != method or manifest.get('parameters') != parameters):
+        print("Method or parameters changed since the last run, rebuilding everything")
+        manifest = None
+    previous_inputs = manifest['inputs'] if manifest else {}
+
+    # Reuse the previous reference if nothing it was built from has changed
+    reference = None
+    reference_info = manifest.get('reference') if manifest else None
+    profile_path = output_dir / '_reference_profile.npy'
+    reference_valid = (
+        reference_info is not None
+        and not rebuild_reference
+        and all(hashes.get(name) == digest for name, digest in reference_info['inputs'].items())
+    )
+
+    if reference_image and Path(reference_image).suffix == '.npy':
+        reference = ReferenceProfile.load(Path(reference_image))
+        reference_info = {'inputs': {}}
+    elif reference_image:
+        reference = ReferenceProfile.from_image(cv2.imread(reference_image))
+        reference_info = {'inputs': {}}
+    elif method == 'histogram':
+        if reference_valid and profile_path.exists():
+            print(f"Reusing reference profile: {profile_path}")
+            reference = ReferenceProfile.load(profile_path)
+        else:
+            print("Accumulating average reference...")
+            accumulator, loaded = accumulate_reference(paths, need_average=True, need_stats=False)
+            ref_img = accumulator.average()
+            cv2.imwrite(str(output_dir / '_reference.jpg'), ref_img)
+            reference = ReferenceProfile.from_image(ref_img)
+            reference.save(profile_path)
+            reference_info = {'inputs': {p.name: hashes[p.name] for p in loaded}}
+    elif method == 'mean_std':
+        if reference_valid:
+            print("Reusing reference statistics")
+            reference = (np.array(reference_info['mean']), np.array(reference_info['std']))
+        else:
+            print("Accumulating reference statistics...")
+            accumulator, loaded = accumulate_reference(paths, need_average=False, need_stats=True)
+            ref_mean, ref_std = accumulator.stats()
+            reference = (ref_mean, ref_std)
+            reference_info = {
+                'inputs': {p.name: hashes[p.name] for p in loaded},
+                'mean': ref_mean.tolist(),
+                'std': ref_std.tolist()
+            }
+    else:
+        reference_info = {'inputs': {}}
+
+    if isinstance(reference, ReferenceProfile):
+        fingerprint = hashlib.sha256(reference.cdfs.tobytes()).hexdigest()
+    elif reference is not None:
+        fingerprint = hashlib.sha256(np.concatenate(reference).astype(np.float64).tobytes()).hexdigest()
+    else:
+        fingerprint = None
+    reference_info['fingerprint'] = fingerprint
+
+    if manifest and manifest['reference'].get('fingerprint') != fingerprint:
+        print("Reference changed, reprocessing every image")
+        previous_inputs = {}
+
+    pending = [
+        p for p in paths
+        if previous_inputs.get(p.name) != hashes[p.name] or not (output_dir / p.name).exists()
+    ]
+
+    # Drop outputs whose inputs were removed
+    for name in set(manifest['inputs'] if manifest else {}) - set(hashes):
+        stale = output_dir / name
+        if stale.exists():
+            stale.unlink()
+            print(f"Removed: {name}")
+
+    print(f"{len(pending)} of {len(paths)} images need processing\n")
+    normalize_files(pending, method, reference, output_dir, jobs)
+
+    write_manifest(output_dir, {
+        'version': MANIFEST_VERSION,
+        'method': method,
+        'parameters': parameters,
+        'reference': reference_info,
+        'inputs': hashes
+    })
+
+    print(f"\nComplete! Processed images saved to: {output_dir}")
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Normalize color grading across satellite images for consistent timelapse viewing.'
@@ -250,7 +645,28 @@ def main():
     parser.add_argument(
         '--reference', '-r',
         type=str,
-        help='Path to reference image for histogram matching (optional)'
+        help='Reference image or saved reference profile (.npy) for histogram matching (optional)'
+    )
+    parser.add_argument(
+        '--jobs', '-j',
+        type=int,
+        default=1,
+        help='Number of worker processes, 0 for one per CPU core (default: 1)'
+    )
+    parser.add_argument(
+        '--streaming', '-s',
+        action='store_true',
+        help='Read one image at a time instead of loading the whole directory into memory'
+    )
+    parser.add_argument(
+        '--incremental', '-i',
+        action='store_true',
+        help='Only process images that are new or changed since the last incremental run'
+    )
+    parser.add_argument(
+        '--rebuild-reference',
+        action='store_true',
+        help='With --incremental, rebuild the reference from all current images'
     )
 
     args = parser.parse_args()
@@ -279,8 +695,15 @@ def main():
     print(f"Method: {args.method}")
     print("=" * 60)
 
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     # Process images
-    process_images(input_path, output_path, args.method, args.reference)
+    if args.incremental:
+        process_images_incremental(
+            input_path, output_path, args.method, args.reference, jobs, args.rebuild_reference
+        )
+    else:
+        process_images(input_path, output_path, args.method, args.reference, jobs, args.streaming)
 
 
 if __name__ == '__main__':